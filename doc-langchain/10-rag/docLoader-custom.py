@@ -19,44 +19,59 @@ class SimpleQALoader(BaseLoader):
         self.file_path = file_path
         self.time_fmt = time_fmt
 
+    def lazy_load(self):
+        """
+        流式解析问答文件
+
+        逐行读取文件，每遇到一组问题(Q)和答案(A)就立即生成一个文档，
+        内存占用不随文件大小增长。文件末尾缺少答案的问题会被跳过。
+
+        Yields:
+            Document: 包含问答内容的文档，包含page_content和metadata
+        """
+        created_ts = os.path.getctime(self.file_path)
+        created_at = datetime.fromtimestamp(created_ts).strftime(self.time_fmt)
+
+        question = None
+        with open(self.file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                # 每两行构成一个 Q/A
+                if question is None:
+                    question = line.lstrip("Q：:").strip()
+                    continue
+                a = line.lstrip("A：:").strip()
+                yield Document(
+                    page_content=f"Q: {question}\nA: {a}",
+                    metadata={
+                        "source": self.file_path,
+                        "created_at": created_at,
+                    }
+                )
+                question = None
+
+        if question is not None:
+            print(f"跳过末尾缺少答案的问题：{question}")
+
     def load(self):
         """
         加载并解析问答文件
-        
+
         读取文件中的问答对，每两行构成一个问答文档，第一行为问题，第二行为答案。
         每个文档包含问题和答案的组合内容，以及文件的元数据信息。
-        
+
         Returns:
             list[Document]: 包含问答内容的文档列表，每个文档包含page_content和metadata
         """
-        with open(self.file_path, "r", encoding="utf-8") as f:
-            lines = [line.strip() for line in f if line.strip()]
-
-        docs = []
-        created_ts = os.path.getctime(self.file_path)
-        created_at = datetime.fromtimestamp(created_ts).strftime(self.time_fmt)
-
-        # 每两行构成一个 Q/A
-        for i in range(0, len(lines), 2):
-            q = lines[i].lstrip("Q：:").strip()
-            a = lines[i+1].lstrip("A：:").strip()
-            page_content = f"Q: {q}\nA: {a}"
-
-            doc = Document(
-                page_content=page_content,
-                metadata={
-                    "source": self.file_path,
-                    "created_at": created_at,
-                }
-            )
-            docs.append(doc)
-
-        return docs
+        return list(self.lazy_load())
 
 
 # 使用示例
 if __name__ == "__main__":
     loader = SimpleQALoader("faq.txt")
+    # 大文件可直接使用 loader.lazy_load() 流式处理
     docs = loader.load()
     print(f"共解析到 {len(docs)} 个文档")
     for i, d in enumerate(docs, 1):
@@ -0,0 +1,149 @@
+import hashlib
+import os
+import pickle
+import signal
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from langchain_core.document_loaders import BaseLoader
+
+
+def _load_file(file_path: str, timeout: int):
+    """
+    在工作进程中按扩展名选择加载器加载单个文件
+
+    超时通过 SIGALRM 在工作进程内部实现，卡住的文件会抛出 TimeoutError，
+    不会占用工作进程（不支持 SIGALRM 的平台上不限时）。
+
+    Args:
+        file_path (str): 文件路径
+        timeout (int): 单个文件的加载超时时间（秒），0 表示不限时
+
+    Returns:
+        list[Document]: 文件加载得到的文档列表
+    """
+    ext = Path(file_path).suffix.lower()
+    if ext == ".md":
+        from langchain_community.document_loaders import UnstructuredMarkdownLoader
+        loader = UnstructuredMarkdownLoader(file_path=file_path)
+    elif ext == ".txt":
+        from langchain_community.document_loaders import TextLoader
+        loader = TextLoader(file_path=file_path, encoding="utf-8")
+    else:
+        from langchain_unstructured import UnstructuredLoader
+        loader = UnstructuredLoader(file_path)
+
+    use_alarm = timeout and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        def on_timeout(signum, frame):
+            raise TimeoutError(f"加载超时({timeout}s)")
+        signal.signal(signal.SIGALRM, on_timeout)
+        signal.alarm(timeout)
+    try:
+        return loader.load()
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+
+
+class ParallelDirectoryLoader(BaseLoader):
+    """
+    并行目录加载器
+
+    将目录下的文件分发到进程池中加载（.md 使用 UnstructuredMarkdownLoader，
+    .txt 使用 TextLoader，其余使用 UnstructuredLoader），按完成顺序流式返回文档。
+    加载结果以 文件路径 + 修改时间 + 文件大小 为键缓存到磁盘，
+    重复加载未改动的知识库目录时直接读取缓存。
+
+    Args:
+        path (str): 目录路径
+        glob (str): 文件匹配模式，默认为 "**/*"
+        workers (int): 进程数，默认为 CPU 核数
+        timeout (int): 单个文件的加载超时时间（秒），默认为 120
+        cache_dir (str): 缓存目录，默认为 ".doc_cache"，为 None 时不使用缓存
+    """
+
+    def __init__(self, path: str, glob: str = "**/*", workers: int = None,
+                 timeout: int = 120, cache_dir: str = ".doc_cache"):
+        self.path = path
+        self.glob = glob
+        self.workers = workers or os.cpu_count()
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_file(self, file_path: str) -> str:
+        """
+        根据文件路径、修改时间和大小计算缓存文件路径
+
+        Args:
+            file_path (str): 源文件路径
+
+        Returns:
+            str: 缓存文件路径
+        """
+        stat = os.stat(file_path)
+        key = f"{os.path.abspath(file_path)}|{stat.st_mtime_ns}|{stat.st_size}"
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".pkl")
+
+    def lazy_load(self):
+        """
+        并行加载目录下的全部文件
+
+        未命中缓存的文件先提交到进程池，工作进程解析的同时返回命中缓存的文件，
+        之后按完成顺序返回解析结果；加载失败或超时的文件会打印提示并跳过。
+
+        Yields:
+            Document: 加载得到的文档
+        """
+        files = sorted(str(p) for p in Path(self.path).glob(self.glob) if p.is_file())
+
+        cached, pending = [], []
+        for file_path in files:
+            cache_file = self._cache_file(file_path) if self.cache_dir else None
+            if cache_file and os.path.exists(cache_file):
+                cached.append(cache_file)
+            else:
+                pending.append((file_path, cache_file))
+
+        executor = ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) if pending else None
+        try:
+            futures = {}
+            if executor:
+                futures = {
+                    executor.submit(_load_file, file_path, self.timeout): (file_path, cache_file)
+                    for file_path, cache_file in pending
+                }
+
+            for cache_file in cached:
+                with open(cache_file, "rb") as f:
+                    yield from pickle.load(f)
+
+            for future in as_completed(futures):
+                file_path, cache_file = futures[future]
+                try:
+                    docs = future.result()
+                except Exception as e:
+                    print(f"加载失败：{file_path}，原因：{e}")
+                    continue
+                if cache_file:
+                    # 先写临时文件再替换，避免中断时留下损坏的缓存
+                    with open(cache_file + ".tmp", "wb") as f:
+                        pickle.dump(docs, f)
+                    os.replace(cache_file + ".tmp", cache_file)
+                yield from docs
+        finally:
+            if executor:
+                # 调用方提前停止迭代时取消尚未开始的任务
+                executor.shutdown(wait=True, cancel_futures=True)
+
+
+# 使用示例
+if __name__ == "__main__":
+    loader = ParallelDirectoryLoader("knowledge_base", glob="**/*.md", workers=4, timeout=60)
+    count = 0
+    for document in loader.lazy_load():
+        count += 1
+        print(f"文档元数据：{document.metadata}")
+    print(f"文档数量：{count}")
@@ -0,0 +1,98 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_redis import RedisConfig, RedisVectorStore
+
+
+class PrecomputedEmbeddings(Embeddings):
+    """
+    返回预先算好的向量的 Embeddings，供向量存储在写入时直接使用。
+
+    写入一批数据前通过 load 放入该批的向量，add_texts 内部调用 embed_documents 时
+    直接返回这些向量，不会再次请求模型；查询或未预先加载的文本仍交给底层模型处理。
+
+    参数:
+        underlying (Embeddings): 底层 Embeddings 对象。
+    """
+
+    def __init__(self, underlying: Embeddings):
+        self.underlying = underlying
+        self._vectors = {}
+
+    def load(self, texts: List[str], vectors: List[List[float]]):
+        """
+        放入一批文本对应的向量（替换上一批）。
+        """
+        self._vectors = dict(zip(texts, vectors))
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        返回已加载的向量，未加载的文本交给底层模型。
+        """
+        missing = [text for text in texts if text not in self._vectors]
+        if missing:
+            self._vectors.update(zip(missing, self.underlying.embed_documents(missing)))
+        return [self._vectors[text] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        查询向量直接交给底层模型。
+        """
+        return self.underlying.embed_query(text)
+
+
+class BatchIngestor:
+    """
+    分批、并发地把文本写入 RedisVectorStore。
+
+    文本按 batch_size 切分后提交到线程池并发向量化（并发数受 max_concurrency 限制，
+    应与 Ollama 服务端的 OLLAMA_NUM_PARALLEL 匹配）；主线程按顺序把已完成的批次写入 Redis，
+    写入第 N 批时，后续批次仍在后台向量化，两者互相重叠。
+
+    参数:
+        embedding (Embeddings): Embeddings 对象，如 OllamaEmbeddings。
+        config (RedisConfig): Redis 向量存储配置。
+        batch_size (int): 每批文本数，默认为 32。
+        max_concurrency (int): 同时进行的向量化请求数，默认为 4。
+    """
+
+    def __init__(self, embedding: Embeddings, config: RedisConfig, batch_size: int = 32, max_concurrency: int = 4):
+        self.embedding = embedding
+        self.precomputed = PrecomputedEmbeddings(embedding)
+        self.vector_store = RedisVectorStore(self.precomputed, config=config)
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[dict]] = None) -> List[str]:
+        """
+        分批向量化并写入全部文本。
+
+        参数:
+            texts (List[str]): 文本列表。
+            metadatas (Optional[List[dict]]): 与文本一一对应的元数据列表。
+
+        返回:
+            List[str]: 写入的 key 列表。
+        """
+        batches = [
+            (texts[i:i + self.batch_size], metadatas[i:i + self.batch_size] if metadatas else None)
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        keys = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            # 预先提交一个窗口的向量化任务，之后每写完一批再补充一批
+            window = self.max_concurrency * 2
+            futures = [executor.submit(self.embedding.embed_documents, batch[0]) for batch in batches[:window]]
+            for i, (batch_texts, batch_metadatas) in enumerate(batches):
+                vectors = futures[i].result()
+                if i + window < len(batches):
+                    futures.append(executor.submit(self.embedding.embed_documents, batches[i + window][0]))
+                futures[i] = None
+
+                self.precomputed.load(batch_texts, vectors)
+                keys.extend(self.vector_store.add_texts(texts=batch_texts, metadatas=batch_metadatas))
+                print(f"已写入 {len(keys)}/{len(texts)} 条，{len(keys) / (time.perf_counter() - start):.1f} 条/秒")
+        return keys
@@ -1,15 +1,19 @@
 import json
 from langchain_ollama import OllamaEmbeddings
-from langchain_redis import RedisConfig, RedisVectorStore
+from langchain_redis import RedisConfig
+from batchIngest import BatchIngestor
+from embeddingCache import CachedEmbeddings
 
 
-def insert_faq(texts, meta_data):
+def insert_faq(texts, meta_data, batch_size=32, max_concurrency=4):
     """
     将FAQ文本数据插入到Redis向量存储中
     
     Args:
         texts (list): 包含问题文本的列表
         meta_data (list): 包含每个问题对应元数据的列表，每个元素为字典格式
+        batch_size (int): 每批向量化的文本数
+        max_concurrency (int): 同时发往 Ollama 的向量化请求数，建议与 OLLAMA_NUM_PARALLEL 一致
         
     Returns:
         None
@@ -19,11 +23,11 @@ def insert_faq(texts, meta_data):
         index_name="faq",
         redis_url="redis://localhost:6379",
     )
-    # 初始化 Embedding 模型
-    embedding = OllamaEmbeddings(model="deepseek-r1:14b")
-    # 创建Redis向量存储实例
-    vector_store = RedisVectorStore(embedding, config=config)
-    vector_store.add_texts(texts=texts, metadatas=meta_data)
+    # 初始化 Embedding 模型，已向量化过的文本直接读取本地缓存
+    embedding = CachedEmbeddings(OllamaEmbeddings(model="deepseek-r1:14b"))
+    # 分批并发向量化，并与 Redis 写入重叠执行
+    ingestor = BatchIngestor(embedding, config, batch_size=batch_size, max_concurrency=max_concurrency)
+    ingestor.add_texts(texts=texts, metadatas=meta_data)
 
 
 def insert_from_file(file_path):
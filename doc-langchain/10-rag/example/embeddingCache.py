@@ -0,0 +1,184 @@
+import base64
+import hashlib
+import os
+import threading
+from array import array
+from concurrent.futures import Future
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.stores import ByteStore
+
+
+class LocalByteStore(ByteStore):
+    """
+    基于本地目录的字节存储，每个 key 对应一个文件。
+
+    参数:
+        root_path (str): 存储目录。
+    """
+
+    def __init__(self, root_path: str):
+        self.root_path = root_path
+        os.makedirs(root_path, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        """
+        返回 key 对应的文件路径。
+
+        key 中可能含有 "/"（如 hf.co/Qwen/...:Q8_0 这样的模型名），整体用 URL 安全的 base64 编码为单个文件名。
+        """
+        return os.path.join(self.root_path, base64.urlsafe_b64encode(key.encode("utf-8")).decode("ascii"))
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[bytes]]:
+        """
+        批量读取，不存在的 key 返回 None。
+        """
+        values = []
+        for key in keys:
+            try:
+                with open(self._path(key), "rb") as f:
+                    values.append(f.read())
+            except FileNotFoundError:
+                values.append(None)
+        return values
+
+    def mset(self, key_value_pairs: Sequence[Tuple[str, bytes]]) -> None:
+        """
+        批量写入。
+        """
+        for key, value in key_value_pairs:
+            # 先写临时文件再替换，并发写同一个 key 时不会读到半个文件
+            tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, self._path(key))
+
+    def mdelete(self, keys: Sequence[str]) -> None:
+        """
+        批量删除。
+        """
+        for key in keys:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def yield_keys(self, prefix: Optional[str] = None) -> Iterator[str]:
+        """
+        遍历存储中的 key。
+        """
+        for name in os.listdir(self.root_path):
+            if name.endswith(".tmp"):
+                continue
+            key = base64.urlsafe_b64decode(name).decode("utf-8")
+            if prefix is None or key.startswith(prefix):
+                yield key
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    带持久化缓存的 Embeddings 包装器，可包装任意 Embeddings（如 OllamaEmbeddings）。
+
+    向量以 float32 字节存入字节存储，key 为 模型名 + 文本 sha256；
+    embed_documents 只把未命中缓存的文本通过一次批量请求发送给底层模型。
+    多个线程同时请求同一段未缓存文本时，只有一个线程真正调用模型，其余线程等待其结果。
+
+    参数:
+        underlying (Embeddings): 被包装的 Embeddings 对象。
+        store (ByteStore): 字节存储，默认为 LocalByteStore(".embedding_cache")。
+        namespace (str): 缓存命名空间，默认取底层对象的 model 属性，不同模型的向量互不混用。
+        cache_queries (bool): 是否同时缓存 embed_query 的结果，默认为 False。
+    """
+
+    def __init__(self, underlying: Embeddings, store: Optional[ByteStore] = None,
+                 namespace: Optional[str] = None, cache_queries: bool = False):
+        self.underlying = underlying
+        self.store = store or LocalByteStore(".embedding_cache")
+        self.namespace = namespace or getattr(underlying, "model", type(underlying).__name__)
+        self.cache_queries = cache_queries
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> str:
+        """
+        计算缓存 key：模型名 + 文本 sha256。
+        """
+        return f"{self.namespace}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        批量获取文本向量，优先读取缓存。
+
+        参数:
+            texts (List[str]): 文本列表。
+
+        返回:
+            List[List[float]]: 与输入顺序一致的向量列表。
+        """
+        keys = [self._key(text) for text in texts]
+        unique = dict(zip(keys, texts))
+        vectors = {
+            key: array("f", value).tolist()
+            for key, value in zip(unique, self.store.mget(list(unique)))
+            if value is not None
+        }
+
+        # 未命中的 key：已有其他线程在计算的等待其结果，其余由当前线程负责
+        owned, waiting = {}, {}
+        with self._lock:
+            for key in unique:
+                if key in vectors:
+                    continue
+                if key in self._inflight:
+                    waiting[key] = self._inflight[key]
+                else:
+                    owned[key] = self._inflight[key] = Future()
+
+        if owned:
+            try:
+                results = self.underlying.embed_documents([unique[key] for key in owned])
+                self.store.mset([(key, array("f", vector).tobytes()) for key, vector in zip(owned, results)])
+                for (key, future), vector in zip(owned.items(), results):
+                    vectors[key] = vector
+                    future.set_result(vector)
+            except Exception as e:
+                for future in owned.values():
+                    if not future.done():
+                        future.set_exception(e)
+                raise
+            finally:
+                with self._lock:
+                    for key in owned:
+                        self._inflight.pop(key, None)
+
+        for key, future in waiting.items():
+            vectors[key] = future.result()
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        获取查询文本向量，cache_queries 为 True 时同样走缓存。
+
+        参数:
+            text (str): 查询文本。
+
+        返回:
+            List[float]: 文本向量。
+        """
+        if self.cache_queries:
+            return self.embed_documents([text])[0]
+        return self.underlying.embed_query(text)
+
+
+if __name__ == "__main__":
+    import time
+    from langchain_ollama import OllamaEmbeddings
+
+    embedding = CachedEmbeddings(OllamaEmbeddings(model="deepseek-r1:14b"))
+    texts = ["在线支付取消订单后钱怎么返还给我呢", "外卖超时了怎么办"]
+    for i in range(2):
+        start = time.perf_counter()
+        embedding.embed_documents(texts)
+        print(f"第{i + 1}次向量化耗时: {time.perf_counter() - start:.3f}s")
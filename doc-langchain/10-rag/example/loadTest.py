@@ -0,0 +1,56 @@
+import asyncio
+import statistics
+import time
+
+import httpx
+
+# 服务地址（先启动 server.py）
+SERVER_URL = "http://127.0.0.1:8000"
+# 并发会话数与每个会话的对话轮数
+SESSIONS = 200
+TURNS = 3
+QUESTIONS = [
+    "在线支付取消订单后钱怎么返还给我呢",
+    "外卖超时了可以赔付吗",
+    "怎么修改收货地址",
+]
+
+
+async def run_session(client: httpx.AsyncClient, session_id: str, latencies: list):
+    """
+    模拟一个用户连续提问多轮。
+
+    参数:
+        client (httpx.AsyncClient): HTTP 客户端。
+        session_id (str): 会话 ID。
+        latencies (list): 收集每次请求耗时的列表。
+    """
+    for turn in range(TURNS):
+        start = time.perf_counter()
+        resp = await client.post(
+            f"{SERVER_URL}/chat",
+            json={"session_id": session_id, "question": QUESTIONS[turn % len(QUESTIONS)]},
+        )
+        resp.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+
+async def main():
+    """
+    并发启动全部会话并统计吞吐量和延迟。
+    """
+    latencies = []
+    limits = httpx.Limits(max_connections=SESSIONS)
+    async with httpx.AsyncClient(timeout=600, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_session(client, f"load-{i}", latencies) for i in range(SESSIONS)))
+        cost = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"会话数: {SESSIONS}，每会话轮数: {TURNS}，总耗时: {cost:.1f}s")
+    print(f"吞吐量: {SESSIONS / cost:.2f} 会话/秒，{len(latencies) / cost:.2f} 请求/秒")
+    print(f"延迟 p50: {statistics.median(latencies):.2f}s，p99: {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.2f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
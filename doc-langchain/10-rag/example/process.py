@@ -1,20 +1,57 @@
 import json
+import time
 from bs4 import BeautifulSoup
 from langchain.schema import Document
 
-def parse_faq_html(file_path):
+# 支持的解析器：BeautifulSoup 内置 html.parser、BeautifulSoup + lxml、selectolax
+PARSERS = ("html.parser", "lxml", "selectolax")
+
+
+def make_faq_doc(file_path, category, question_raw, answer):
+    """
+    把一条问答封装为Document对象。
+
+    参数:
+        file_path (str): FAQ HTML文件的路径。
+        category (str): 问题所属分类。
+        question_raw (str): 原始问题文本（可能带有 Q： 前缀）。
+        answer (str): 答案文本。
+
+    返回:
+        Document: metadata包含分类、问题、答案和来源信息的文档对象。
+    """
+    # 去掉 Q：
+    question = question_raw.lstrip("Q：").strip()
+    return Document(
+        page_content="",
+        metadata={
+            "source": file_path,
+            "category": category,
+            "question": question,
+            "answer": answer
+        }
+    )
+
+
+def parse_faq_html(file_path, parser="html.parser"):
     """
     解析FAQ HTML文件，提取问题和答案信息并封装为Document对象列表。
 
     参数:
         file_path (str): FAQ HTML文件的路径。
+        parser (str): 解析器，可选 "html.parser"、"lxml"、"selectolax"，默认为 "html.parser"。
 
     返回:
         list: 包含Document对象的列表，每个对象的metadata包含分类、问题、答案和来源信息。
     """
+    if parser not in PARSERS:
+        raise ValueError(f"不支持的解析器: {parser}，可选: {PARSERS}")
+    if parser == "selectolax":
+        return _parse_faq_html_selectolax(file_path)
+
     docs = []
     with open(file_path, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f, "html.parser")
+        soup = BeautifulSoup(f, parser)
 
     current_category = None
 
@@ -28,24 +65,128 @@ def parse_faq_html(file_path):
 
             dl = li.find("dl")
             if dl:
-                # 去掉 Q：
-                question_raw = dl.find("dt").get_text(strip=True)
-                question = question_raw.lstrip("Q：").strip()
-                answer = dl.find("dd").get_text(strip=True)
-
-                docs.append(
-                    Document(
-                        page_content="",
-                        metadata={
-                            "source": file_path,
-                            "category": current_category,
-                            "question": question,
-                            "answer": answer
-                        }
-                    )
-                )
+                docs.append(make_faq_doc(
+                    file_path,
+                    current_category,
+                    dl.find("dt").get_text(strip=True),
+                    dl.find("dd").get_text(strip=True)
+                ))
+    return docs
+
+
+def _parse_faq_html_selectolax(file_path):
+    """
+    使用 selectolax 的 lexbor 后端（基于 C 实现的 HTML 解析器）解析FAQ HTML文件，结果与 parse_faq_html 一致。
+
+    参数:
+        file_path (str): FAQ HTML文件的路径。
+
+    返回:
+        list: 包含Document对象的列表。
+    """
+    from selectolax.lexbor import LexborHTMLParser
+
+    with open(file_path, "r", encoding="utf-8") as f:
+        tree = LexborHTMLParser(f.read())
+
+    docs = []
+    current_category = None
+    for ul in tree.css("ul"):
+        for li in ul.iter():
+            if li.tag != "li":
+                continue
+            h1 = li.css_first("h1")
+            if h1:  # 分类标题
+                current_category = h1.text(strip=True)
+                continue
+
+            dl = li.css_first("dl")
+            if dl:
+                docs.append(make_faq_doc(
+                    file_path,
+                    current_category,
+                    dl.css_first("dt").text(strip=True),
+                    dl.css_first("dd").text(strip=True)
+                ))
     return docs
 
+
+def iter_faq_html(file_path, chunk_size=64 * 1024):
+    """
+    增量解析FAQ HTML文件，每当 <ul> 的一个直接子 <li> 闭合就立即产出其中问答对应的Document。
+
+    使用 lxml 的 HTMLPullParser 分块读取文件，处理完的<li>会被立即清理，
+    内存占用不随页面大小增长。分类跟踪规则与 parse_faq_html 相同。
+
+    参数:
+        file_path (str): FAQ HTML文件的路径。
+        chunk_size (int): 每次读取的字符数，默认为 64K。
+
+    生成:
+        Document: metadata包含分类、问题、答案和来源信息的文档对象。
+    """
+    from lxml import etree
+
+    def text_of(elem):
+        # 等价于 BeautifulSoup 的 get_text(strip=True)
+        return "".join(s.strip() for s in elem.itertext()) if elem is not None else ""
+
+    pull_parser = etree.HTMLPullParser(events=("end",))
+    current_category = None
+    with open(file_path, "r", encoding="utf-8") as f:
+        while True:
+            data = f.read(chunk_size)
+            if data:
+                pull_parser.feed(data)
+            else:
+                pull_parser.close()
+            for _, elem in pull_parser.read_events():
+                # 与 parse_faq_html 一致：只处理 <ul> 的直接子 <li>，
+                # <li> 闭合时其中的内容已完整，含 <h1> 的是分类标题，否则取其中的 <dl>
+                if elem.tag != "li":
+                    continue
+                parent = elem.getparent()
+                if parent is None or parent.tag != "ul":
+                    continue
+                h1 = elem.find(".//h1")
+                if h1 is not None:  # 分类标题
+                    current_category = text_of(h1)
+                else:
+                    dl = elem.find(".//dl")
+                    if dl is not None:
+                        yield make_faq_doc(file_path, current_category,
+                                           text_of(dl.find(".//dt")), text_of(dl.find(".//dd")))
+                # 释放已处理完的节点；嵌套在其他 <li> 中的节点留给外层 <li> 查找
+                if next(elem.iterancestors("li"), None) is None:
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+            if not data:
+                break
+
+
+def benchmark_parsers(file_path, repeat=3):
+    """
+    对比不同解析器解析同一FAQ页面的耗时。
+
+    参数:
+        file_path (str): FAQ HTML文件的路径。
+        repeat (int): 每种解析器重复次数，默认为 3。
+    """
+    cases = {parser: (lambda p=parser: parse_faq_html(file_path, parser=p)) for parser in PARSERS}
+    cases["lxml 增量"] = lambda: list(iter_faq_html(file_path))
+    for name, fn in cases.items():
+        try:
+            costs = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                count = len(fn())
+                costs.append(time.perf_counter() - start)
+            print(f"{name:<12} 文档数: {count:<6} 最短耗时: {min(costs) * 1000:.1f} ms")
+        except ImportError as e:
+            print(f"{name:<12} 跳过: {e}")
+
+
 def save_docs_to_json(docs, output_file):
     """
     将Document对象列表保存为JSON格式文件。
@@ -71,8 +212,9 @@ def save_docs_to_json(docs, output_file):
     print(f"FAQ 已保存到 {output_file}")
 
 if __name__ == "__main__":
-    faq_docs = parse_faq_html("faq.html")
+    faq_docs = parse_faq_html("faq.html", parser="lxml")
     for d in faq_docs:
         print(d.metadata)
     save_docs_to_json(faq_docs, "faq.json")
+    benchmark_parsers("faq.html")
 
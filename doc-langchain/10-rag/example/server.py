@@ -0,0 +1,134 @@
+import asyncio
+import json
+import weakref
+
+import redis.asyncio as aioredis
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import AIMessage, HumanMessage, message_to_dict, messages_from_dict
+from pydantic import BaseModel
+
+from run import build_chain
+
+# ---------- 配置 ----------
+
+REDIS_URL = "redis://localhost:6379/0"
+# 历史记录 key 前缀与过期时间（秒）
+HISTORY_PREFIX = "rag:history:"
+HISTORY_TTL = 24 * 3600
+# 每个会话保留的最近消息数（5 轮对话）；当前链只用到最后的问题，历史只需保留一个有界窗口
+HISTORY_MAX_MESSAGES = 10
+# 全局同时处理的请求数上限，应与 Ollama 的并发能力相匹配
+MAX_CONCURRENCY = 16
+
+
+# ---------- 异步历史记录 ----------
+
+class AsyncRedisHistory:
+    """
+    基于 redis.asyncio 的会话历史记录，每个会话的消息以 JSON 形式保存在一个 Redis 列表中，
+    写入时裁剪为最近 HISTORY_MAX_MESSAGES 条，单次请求的开销不随对话变长而增加。
+
+    参数:
+        client (aioredis.Redis): 异步 Redis 客户端。
+        session_id (str): 会话 ID。
+    """
+
+    def __init__(self, client: aioredis.Redis, session_id: str):
+        self.client = client
+        self.key = f"{HISTORY_PREFIX}{session_id}"
+
+    async def aget_messages(self):
+        """
+        读取会话最近 HISTORY_MAX_MESSAGES 条历史消息。
+
+        返回:
+            list: 消息对象列表。
+        """
+        items = await self.client.lrange(self.key, -HISTORY_MAX_MESSAGES, -1)
+        return messages_from_dict([json.loads(item) for item in items])
+
+    async def aadd_messages(self, messages):
+        """
+        追加消息、裁剪到最近 HISTORY_MAX_MESSAGES 条并刷新过期时间（一次往返完成）。
+
+        参数:
+            messages (list): 消息对象列表。
+        """
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(self.key, *[json.dumps(message_to_dict(m), ensure_ascii=False) for m in messages])
+        pipe.ltrim(self.key, -HISTORY_MAX_MESSAGES, -1)
+        pipe.expire(self.key, HISTORY_TTL)
+        await pipe.execute()
+
+
+# ---------- 服务 ----------
+
+class ChatRequest(BaseModel):
+    session_id: str
+    question: str
+
+
+app = FastAPI(title="外卖智能客服", version="v1.0", description="基于RAG的多会话智能客服服务")
+
+# 链只构建一次，所有请求共用
+chain = build_chain()
+redis_client = aioredis.from_url(REDIS_URL)
+# 全局并发上限
+semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+# 每个会话一把锁，保证同一会话内的请求按顺序处理；没有请求引用时自动回收
+session_locks = weakref.WeakValueDictionary()
+
+
+def get_session_lock(session_id: str) -> asyncio.Lock:
+    """
+    获取会话锁，不存在时创建。
+    """
+    lock = session_locks.get(session_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        session_locks[session_id] = lock
+    return lock
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    """
+    非流式问答：返回完整回答。
+    """
+    lock = get_session_lock(request.session_id)
+    async with lock, semaphore:
+        history = AsyncRedisHistory(redis_client, request.session_id)
+        question = HumanMessage(content=request.question)
+        # 与 RunnableWithMessageHistory 一致：传入 历史消息 + 当前问题
+        answer = await chain.ainvoke(await history.aget_messages() + [question])
+        await history.aadd_messages([question, AIMessage(content=answer)])
+    return {"session_id": request.session_id, "answer": answer}
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    流式问答：以纯文本流逐段返回回答。
+    """
+
+    async def generate():
+        lock = get_session_lock(request.session_id)
+        async with lock, semaphore:
+            history = AsyncRedisHistory(redis_client, request.session_id)
+            question = HumanMessage(content=request.question)
+            parts = []
+            async for chunk in chain.astream(await history.aget_messages() + [question]):
+                parts.append(chunk)
+                yield chunk
+            await history.aadd_messages([question, AIMessage(content="".join(parts))])
+
+    return StreamingResponse(generate(), media_type="text/plain; charset=utf-8")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+# 访问：http://127.0.0.1:8000/docs
@@ -0,0 +1,187 @@
+import re
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import TextSplitter
+
+# 代码块围栏，围栏内的 # 不是标题
+FENCE_PATTERN = re.compile(r"^\s*(```|~~~)")
+# 超长行的切分点：依次尝试句末标点、空格，最后按字符硬切
+LONG_LINE_SEPARATORS = ["。", "！", "？", "；", ". ", " "]
+
+
+class MarkdownHeaderRecursiveSplitter(TextSplitter):
+    """
+    单遍扫描的 Markdown 标题感知分割器
+
+    合并了 MarkdownHeaderTextSplitter + RecursiveCharacterTextSplitter 两个阶段：
+    逐行扫描一次文档，维护当前的标题栈作为元数据，同时把正文行装箱成不超过
+    chunk_size 的文本块，相邻块之间保留 chunk_overlap 的重叠，
+    不会生成中间的章节 Document 列表。
+    """
+
+    def __init__(self, headers_to_split_on: List[Tuple[str, str]], **kwargs):
+        """
+        参数:
+            headers_to_split_on (List[Tuple[str, str]]): 标题标记及对应的元数据键，例如 [("#", "Header 1")]
+            **kwargs: 传给 TextSplitter 的参数，如 chunk_size、chunk_overlap、length_function
+        """
+        super().__init__(**kwargs)
+        # 长标记优先匹配，避免 "##" 被当成 "#"
+        self.headers = sorted(headers_to_split_on, key=lambda h: len(h[0]), reverse=True)
+
+    def _match_header(self, line: str):
+        """
+        判断一行是否为需要分割的标题
+
+        返回:
+            tuple | None: (标题级别, 元数据键, 标题文本)，不是标题时返回 None
+        """
+        for marker, name in self.headers:
+            if line.startswith(marker) and (len(line) == len(marker) or line[len(marker)] == " "):
+                return len(marker), name, line[len(marker):].strip()
+        return None
+
+    def _split_long_line(self, line: str, separators: List[str]) -> List[str]:
+        """
+        递归切分超过 chunk_size 的单行文本
+
+        返回:
+            List[str]: 每段都不超过 chunk_size 的文本片段
+        """
+        if self._length_function(line) <= self._chunk_size:
+            return [line]
+        for i, sep in enumerate(separators):
+            if sep in line:
+                split = line.split(sep)
+                parts = [p + sep for p in split[:-1]] + [split[-1]]
+                pieces = []
+                for part in parts:
+                    if part:
+                        pieces.extend(self._split_long_line(part, separators[i + 1:]))
+                return pieces
+        step = self._chunk_size
+        return [line[i:i + step] for i in range(0, len(line), step)]
+
+    def split_markdown(self, text: str) -> Iterator[Document]:
+        """
+        单遍扫描 Markdown 文本，直接产出带标题元数据的文本块
+
+        参数:
+            text (str): Markdown 原文
+
+        生成:
+            Document: 文本块，metadata 为当前所属的各级标题
+        """
+        header_stack = {}   # 级别 -> (元数据键, 标题文本)
+        buffer = []         # 当前块中的 (前导分隔符, 文本片段)，同一行切出的后续片段前导分隔符为空
+        buffer_len = 0      # 当前块长度（含分隔符）
+        in_fence = False
+
+        def metadata():
+            return {name: title for _, (name, title) in sorted(header_stack.items())}
+
+        def emit(keep_overlap: bool):
+            nonlocal buffer, buffer_len
+            content = "".join(sep + piece for sep, piece in buffer).strip()
+            chunk = Document(page_content=content, metadata=metadata()) if content else None
+            # 从尾部保留不超过 chunk_overlap 的行作为下一块的开头
+            tail, tail_len = [], 0
+            if keep_overlap:
+                for sep, piece in reversed(buffer):
+                    piece_len = self._length_function(piece) + len(sep)
+                    if tail_len + piece_len > self._chunk_overlap:
+                        break
+                    tail.insert(0, (sep, piece))
+                    tail_len += piece_len
+            buffer, buffer_len = tail, tail_len
+            return chunk
+
+        for line in text.splitlines():
+            if FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+
+            header = None if in_fence else self._match_header(line)
+            if header:
+                # 新章节开始：输出上一章节剩余内容，章节之间不重叠
+                chunk = emit(keep_overlap=False)
+                if chunk:
+                    yield chunk
+                level, name, title = header
+                for lvl in [lvl for lvl in header_stack if lvl >= level]:
+                    del header_stack[lvl]
+                header_stack[level] = (name, title)
+                continue
+
+            for i, piece in enumerate(self._split_long_line(line, LONG_LINE_SEPARATORS)):
+                sep = "\n" if i == 0 else ""
+                piece_len = self._length_function(piece) + len(sep)
+                # 块首片段的前导换行会在输出时被 strip 掉，不计入长度
+                if buffer and buffer_len - len(buffer[0][0]) + piece_len > self._chunk_size:
+                    chunk = emit(keep_overlap=True)
+                    if chunk:
+                        yield chunk
+                    # 重叠部分加上新片段仍超长时放弃重叠
+                    if buffer and buffer_len - len(buffer[0][0]) + piece_len > self._chunk_size:
+                        buffer, buffer_len = [], 0
+                buffer.append((sep, piece))
+                buffer_len += piece_len
+
+        chunk = emit(keep_overlap=False)
+        if chunk:
+            yield chunk
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        分割文本，只返回文本内容
+
+        参数:
+            text (str): Markdown 原文
+
+        返回:
+            List[str]: 文本块列表
+        """
+        return [doc.page_content for doc in self.split_markdown(text)]
+
+
+def two_stage_split(text: str, headers_to_split_on, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """
+    原有的两阶段分割方式（见 splitMarkdown.py），作为性能对比基准
+    """
+    from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
+
+    headers_text_splitter = MarkdownHeaderTextSplitter(headers_to_split_on=headers_to_split_on)
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap,
+                                                   length_function=len)
+    return text_splitter.split_documents(headers_text_splitter.split_text(text))
+
+
+# 使用示例 + 性能对比
+if __name__ == "__main__":
+    # 对比用的 Markdown 文档目录
+    docs_dir = "docs"
+    headers_to_split_on = [
+        ("#", "Header 1"),
+        ("##", "Header 2"),
+        ("###", "Header 3"),
+    ]
+    texts = [p.read_text(encoding="utf-8") for p in Path(docs_dir).rglob("*.md")]
+    total_mb = sum(len(t.encode("utf-8")) for t in texts) / 2 ** 20
+    print(f"文档数量：{len(texts)}，总大小：{total_mb:.2f} MB")
+
+    splitter = MarkdownHeaderRecursiveSplitter(headers_to_split_on, chunk_size=100, chunk_overlap=30,
+                                               length_function=len)
+    start = time.perf_counter()
+    single_pass = [doc for text in texts for doc in splitter.split_markdown(text)]
+    single_cost = time.perf_counter() - start
+
+    start = time.perf_counter()
+    two_stage = [doc for text in texts for doc in two_stage_split(text, headers_to_split_on, 100, 30)]
+    two_stage_cost = time.perf_counter() - start
+
+    print(f"单遍分割：{len(single_pass)} 块，耗时 {single_cost:.3f}s，{total_mb / single_cost:.2f} MB/s")
+    print(f"两阶段分割：{len(two_stage)} 块，耗时 {two_stage_cost:.3f}s，{total_mb / two_stage_cost:.2f} MB/s")
+    for doc in single_pass[:5]:
+        print(f"文档片段大小：{len(doc.page_content)}, 文档元数据：{doc.metadata}")
@@ -29,7 +29,7 @@ class CustomTextSplitter(TextSplitter):
         result_texts = []
         for text_item in text_array:
             strip_text_item = text_item.strip()
-            if strip_text_item is None:
+            if not strip_text_item:
                 continue
             # 2.按句进行分割
             result_texts.append(strip_text_item.split("。")[0])
@@ -0,0 +1,155 @@
+import re
+import time
+from collections import deque
+from typing import Iterator, List, Tuple
+
+from langchain_core.documents import Document
+from langchain_text_splitters import TextSplitter
+
+# 句子边界：中文句末标点（可带后引号/括号）、英文句点后接空白、或空行
+SENTENCE_BOUNDARY = re.compile(
+    r"(?:[。！？!?；;…]+[”’\"'）)」』]*|\.(?=\s|$)[\"')]*|\n\s*\n)\s*"
+)
+
+
+class SentenceTextSplitter(TextSplitter):
+    """
+    中英文句子感知的文本分割器
+
+    用预编译的边界正则单遍扫描文本切出句子，再把句子按顺序装箱成不超过
+    chunk_size 个字符的文本块，相邻块之间保留不超过 chunk_overlap 个字符的整句重叠。
+    每个块都是原文的连续片段，可以带上字符偏移，全部内容都会被保留。
+    """
+
+    def iter_sentences(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        单遍扫描切分句子
+
+        参数:
+            text (str): 原始文本
+
+        生成:
+            Tuple[int, int]: 句子在原文中的 [start, end) 偏移（包含句末标点和其后的空白）
+        """
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(text):
+            end = match.end()
+            if end > start:
+                yield start, end
+                start = end
+        if start < len(text):
+            yield start, len(text)
+
+    def _hard_split(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """
+        把超过 chunk_size 的单个句子按固定窗口切开，窗口之间保留 chunk_overlap 重叠
+        """
+        step = max(1, self._chunk_size - self._chunk_overlap)
+        pos = start
+        while True:
+            yield pos, min(pos + self._chunk_size, end)
+            if pos + self._chunk_size >= end:
+                return
+            pos += step
+
+    def iter_chunks(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """
+        按句子装箱并流式产出文本块
+
+        参数:
+            text (str): 原始文本
+
+        生成:
+            Tuple[int, int, str]: (起始偏移, 结束偏移, 块内容)，内容已去除首尾空白
+        """
+        window = deque()  # 当前块内的句子偏移
+
+        def span(s, e):
+            # 去除首尾空白，并同步调整偏移，保证 text[s:e] == 块内容
+            chunk = text[s:e]
+            stripped = chunk.strip()
+            if stripped:
+                s += len(chunk) - len(chunk.lstrip())
+                return s, s + len(stripped), stripped
+            return None
+
+        def emit():
+            return span(window[0][0], window[-1][1])
+
+        for sent_start, sent_end in self.iter_sentences(text):
+            if sent_end - sent_start > self._chunk_size:
+                # 超长句子：先输出已有内容，再按窗口硬切
+                if window:
+                    chunk = emit()
+                    if chunk:
+                        yield chunk
+                    window.clear()
+                for s, e in self._hard_split(sent_start, sent_end):
+                    chunk = span(s, e)
+                    if chunk:
+                        yield chunk
+                continue
+
+            if window and sent_end - window[0][0] > self._chunk_size:
+                chunk = emit()
+                if chunk:
+                    yield chunk
+                # 只保留尾部不超过 chunk_overlap 的整句，且要给新句子留出空间
+                while window and (window[-1][1] - window[0][0] > self._chunk_overlap
+                                  or sent_end - window[0][0] > self._chunk_size):
+                    window.popleft()
+            window.append((sent_start, sent_end))
+
+        if window:
+            chunk = emit()
+            if chunk:
+                yield chunk
+
+    def split_text(self, text: str) -> List[str]:
+        """
+        将输入文本分割成多个文本片段
+
+        参数:
+            text (str): 需要分割的原始文本字符串
+
+        返回:
+            List[str]: 分割后的文本片段列表，覆盖原文全部内容
+        """
+        return [chunk for _, _, chunk in self.iter_chunks(text)]
+
+    def split_to_documents(self, text: str, metadata: dict = None) -> List[Document]:
+        """
+        将文本分割为文档对象，元数据中带有字符偏移
+
+        参数:
+            text (str): 需要分割的原始文本字符串
+            metadata (dict): 附加到每个文档的元数据
+
+        返回:
+            List[Document]: 文档列表，metadata 包含 start_index 和 end_index
+        """
+        return [
+            Document(page_content=chunk, metadata={**(metadata or {}), "start_index": s, "end_index": e})
+            for s, e, chunk in self.iter_chunks(text)
+        ]
+
+
+if __name__ == "__main__":
+    # 1.文本分割
+    content = (
+        "大模型RAG（检索增强生成）是一种结合生成模型与外部知识检索的技术。它通过从大规模文档或数据库中检索相关信息，"
+        "辅助生成模型以提升回答的准确性和相关性！RAG is widely used in QA systems. It needs a high-quality "
+        "knowledge base, e.g. version 3.14 docs.\n\n其核心流程包括用户输入查询、系统检索相关知识、生成模型基于检索结果生成内容？"
+    )
+    splitter = SentenceTextSplitter(chunk_size=60, chunk_overlap=20)
+    for document in splitter.split_to_documents(content, {"source": "demo"}):
+        print(f"文本分割片段大小：{len(document.page_content)}, 元数据：{document.metadata}, 文本内容：{document.page_content}")
+
+    # 2.吞吐量测试
+    big_text = content * 20000
+    size_mb = len(big_text.encode("utf-8")) / 2 ** 20
+    splitter = SentenceTextSplitter(chunk_size=500, chunk_overlap=100)
+    start = time.perf_counter()
+    count = sum(1 for _ in splitter.iter_chunks(big_text))
+    cost = time.perf_counter() - start
+    print(f"文本大小：{size_mb:.1f} MB，文本块：{count}，耗时：{cost:.2f}s，吞吐量：{size_mb / cost:.1f} MB/s")
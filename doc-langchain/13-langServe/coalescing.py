@@ -0,0 +1,230 @@
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+
+class _AsyncStream:
+    """
+    一次进行中的异步流式生成。
+
+    生产者任务把块追加到 chunks 中，每个订阅者从第 0 块开始读取，
+    晚加入的请求也能拿到完整输出；所有订阅者都离开后取消生成。
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Condition()
+
+
+class _SyncStream:
+    """
+    一次进行中的同步流式生成，生产者在后台线程中运行。
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = threading.Condition()
+
+
+class CoalescingChatModel(BaseChatModel):
+    """
+    合并相同请求的聊天模型包装器。
+
+    模型、参数和消息完全相同的并发请求共用一次正在进行的生成：
+    非流式调用共享同一个结果；流式调用由一个生产者读取底层模型，
+    把每个块分发给所有等待的请求。生成结束后不保留结果，之后的请求会重新调用模型。
+
+    用法:
+        llm = CoalescingChatModel(model=ChatOllama(model="qwen3:14b"))
+    """
+
+    model: BaseChatModel
+    """实际调用的聊天模型"""
+
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _futures: Dict[str, Future] = PrivateAttr(default_factory=dict)
+    _async_futures: Dict[str, asyncio.Future] = PrivateAttr(default_factory=dict)
+    _streams: Dict[str, _SyncStream] = PrivateAttr(default_factory=dict)
+    _async_streams: Dict[str, _AsyncStream] = PrivateAttr(default_factory=dict)
+    _stats: Dict[str, int] = PrivateAttr(default_factory=lambda: {"requests": 0, "generations": 0})
+
+    @property
+    def _llm_type(self) -> str:
+        return f"coalescing-{self.model._llm_type}"
+
+    def _key(self, messages: List[BaseMessage], stop: Optional[List[str]], **kwargs: Any) -> str:
+        """由模型参数和消息内容生成请求的唯一标识"""
+        payload = json.dumps(
+            [self.model._get_llm_string(stop=stop, **kwargs), [message_to_dict(m) for m in messages]],
+            sort_keys=True, ensure_ascii=False, default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _count(self, leader: bool):
+        with self._lock:
+            self._stats["requests"] += 1
+            if leader:
+                self._stats["generations"] += 1
+
+    def stats(self) -> dict:
+        """
+        返回:
+            dict: 请求数、实际生成次数，以及被合并（未调用模型）的请求数
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["coalesced"] = stats["requests"] - stats["generations"]
+        return stats
+
+    # ---------- 非流式 ----------
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        key = self._key(messages, stop, **kwargs)
+        with self._lock:
+            future = self._futures.get(key)
+            leader = future is None
+            if leader:
+                future = self._futures[key] = Future()
+        self._count(leader)
+        if not leader:
+            return future.result()
+
+        try:
+            message = self.model.invoke(messages, stop=stop, **kwargs)
+            future.set_result(ChatResult(generations=[ChatGeneration(message=message)]))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._futures.pop(key, None)
+        return future.result()
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        key = self._key(messages, stop, **kwargs)
+        future = self._async_futures.get(key)
+        leader = future is None
+        if leader:
+            async def generate():
+                try:
+                    message = await self.model.ainvoke(messages, stop=stop, **kwargs)
+                    return ChatResult(generations=[ChatGeneration(message=message)])
+                finally:
+                    self._async_futures.pop(key, None)
+
+            # 生成在独立任务中运行，发起请求的调用方被取消时不影响其他等待者
+            future = self._async_futures[key] = asyncio.ensure_future(generate())
+        self._count(leader)
+        return await asyncio.shield(future)
+
+    # ---------- 流式 ----------
+
+    def _produce(self, key: str, stream: _SyncStream, messages: List[BaseMessage], stop: Optional[List[str]],
+                 **kwargs: Any):
+        """后台线程：读取底层模型的流式输出并通知所有订阅者"""
+        try:
+            for chunk in self.model.stream(messages, stop=stop, **kwargs):
+                with stream.changed:
+                    stream.chunks.append(chunk)
+                    stream.changed.notify_all()
+        except BaseException as e:
+            stream.error = e
+        finally:
+            with self._lock:
+                self._streams.pop(key, None)
+            with stream.changed:
+                stream.done = True
+                stream.changed.notify_all()
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        key = self._key(messages, stop, **kwargs)
+        with self._lock:
+            stream = self._streams.get(key)
+            leader = stream is None
+            if leader:
+                stream = self._streams[key] = _SyncStream()
+        self._count(leader)
+        if leader:
+            threading.Thread(target=self._produce, args=(key, stream, messages, stop), kwargs=kwargs,
+                             daemon=True).start()
+
+        index = 0
+        while True:
+            with stream.changed:
+                while index >= len(stream.chunks) and not stream.done:
+                    stream.changed.wait()
+                pending = stream.chunks[index:]
+                done = stream.done
+            for chunk in pending:
+                # 外层 stream() 会修改块的元数据，每个订阅者使用独立副本
+                yield ChatGenerationChunk(message=chunk.model_copy())
+            index += len(pending)
+            if done and index >= len(stream.chunks):
+                break
+        if stream.error is not None:
+            raise stream.error
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        key = self._key(messages, stop, **kwargs)
+        stream = self._async_streams.get(key)
+        leader = stream is None
+        if leader:
+            stream = self._async_streams[key] = _AsyncStream()
+
+            async def produce():
+                try:
+                    async for chunk in self.model.astream(messages, stop=stop, **kwargs):
+                        async with stream.changed:
+                            stream.chunks.append(chunk)
+                            stream.changed.notify_all()
+                except BaseException as e:
+                    stream.error = e
+                finally:
+                    self._async_streams.pop(key, None)
+                    async with stream.changed:
+                        stream.done = True
+                        stream.changed.notify_all()
+
+            stream.task = asyncio.ensure_future(produce())
+        self._count(leader)
+
+        stream.subscribers += 1
+        index = 0
+        try:
+            while True:
+                async with stream.changed:
+                    await stream.changed.wait_for(lambda: index < len(stream.chunks) or stream.done)
+                    pending = stream.chunks[index:]
+                    done = stream.done
+                for chunk in pending:
+                    yield ChatGenerationChunk(message=chunk.model_copy())
+                index += len(pending)
+                if done and index >= len(stream.chunks):
+                    break
+        finally:
+            stream.subscribers -= 1
+            if stream.subscribers == 0 and not stream.done:
+                # 所有请求都已断开，停止生成
+                self._async_streams.pop(key, None)
+                stream.task.cancel()
+        if stream.error is not None and not isinstance(stream.error, asyncio.CancelledError):
+            raise stream.error
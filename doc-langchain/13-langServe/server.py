@@ -4,14 +4,16 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_ollama import ChatOllama
 
+from coalescing import CoalescingChatModel
+
 # Prompt
 prompt = ChatPromptTemplate.from_messages([
     ("system", "你是一个翻译助手。请将输入翻译成{language}。"),
     ("human", "{input}")
 ])
 
-# LLM
-llm = ChatOllama(base_url="http://localhost:11434", model="qwen3:14b", reasoning=False)
+# LLM：相同输入的并发请求共用一次生成，流式输出分发给所有请求
+llm = CoalescingChatModel(model=ChatOllama(base_url="http://localhost:11434", model="qwen3:14b", reasoning=False))
 parser = StrOutputParser()
 
 # 构建 chain 对象
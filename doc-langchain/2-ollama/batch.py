@@ -13,4 +13,5 @@ questions = [
 # 批量调用大模型
 response = model.batch(questions)
 for q, r in zip(questions, response):
-    print(f"问题：{q}\n回答：{r}\n")
\ No newline at end of file
+    print(f"问题：{q}\n回答：{r}\n")
+# 大批量离线任务（需要控制并发、断点续跑）请使用 batchRunner.py 中的 AsyncBatchRunner
@@ -0,0 +1,305 @@
+# 大批量异步调用：自适应并发 + 断点续跑
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import AsyncIterator, Iterable, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import Runnable
+
+
+class AdaptiveConcurrency:
+    """
+    根据请求耗时和错误调整并发数（加性增、乘性减）。
+
+    Ollama 同时处理的请求数由 OLLAMA_NUM_PARALLEL 决定，超出的请求在服务端排队，
+    表现为单个请求耗时明显变长。耗时按输出 token 数归一化，避免回答长短不同被误判为排队；
+    每完成 limit 个请求（一个窗口）做一次判断：窗口平均耗时超过基准的 tolerance 倍时并发减 1，
+    否则加 1；请求出错时并发减半。
+    基准是各窗口平均耗时的滑动平均而不是历史最小值，偶然的快窗口不会把基准压得过低、
+    导致并发只降不升；饱和窗口对基准的影响只有正常窗口的十分之一。
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32, tolerance: float = 1.5,
+                 smoothing: float = 0.1):
+        """
+        参数:
+            initial (int): 初始并发数，建议设为 OLLAMA_NUM_PARALLEL
+            minimum (int): 最小并发数
+            maximum (int): 最大并发数
+            tolerance (float): 窗口平均耗时超过基准多少倍时认为服务端已饱和
+            smoothing (float): 基准跟随窗口平均耗时的平滑系数，越小基准变化越慢
+        """
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.baseline: Optional[float] = None
+        self._window_sum = 0.0
+        self._window_count = 0
+
+    def observe(self, latency: float, ok: bool = True, tokens: Optional[int] = None):
+        """
+        根据一次请求的结果调整并发数。
+
+        参数:
+            latency (float): 请求耗时（秒）
+            ok (bool): 请求是否成功
+            tokens (Optional[int]): 输出的 token 数（Ollama 的 eval_count），有值时按每 token 耗时计算
+        """
+        if not ok:
+            self.limit = max(self.minimum, self.limit // 2)
+            self._window_sum, self._window_count = 0.0, 0
+            return
+        self._window_sum += latency / tokens if tokens else latency
+        self._window_count += 1
+        if self._window_count < self.limit:
+            return
+
+        average = self._window_sum / self._window_count
+        self._window_sum, self._window_count = 0.0, 0
+        if self.baseline is None:
+            self.baseline = average
+            return
+        if average > self.baseline * self.tolerance:
+            # 服务端开始排队：减小并发；基准只缓慢跟随，
+            # 耗时整体变长（如后面的提示词更长）时最终也会接受新的耗时，重新增大并发
+            self.limit = max(self.minimum, self.limit - 1)
+            self.baseline += self.smoothing / 10 * (average - self.baseline)
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+            self.baseline += self.smoothing * (average - self.baseline)
+
+
+def job_fingerprint(prompts: Sequence) -> str:
+    """
+    计算输入列表的指纹，用于确认检查点属于同一个任务。
+
+    参数:
+        prompts (Sequence): 提示词列表
+
+    返回:
+        str: sha256 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    for prompt in prompts:
+        digest.update(json.dumps(prompt, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Checkpoint:
+    """
+    以 JSONL 追加写入已完成的结果，进程崩溃后重新运行时跳过这些序号。
+
+    第一行为 {"job": 任务标识}，打开时与当前任务比对，
+    避免换了输入后误用旧的检查点、跳过实际未完成的序号。
+    """
+
+    def __init__(self, path: str, job_id: str):
+        """
+        参数:
+            path (str): 检查点文件路径
+            job_id (str): 任务标识，如输入列表的指纹
+        """
+        self.path = path
+        self.job_id = job_id
+        self._file = None
+        self._has_header = self._check_header()
+
+    def _check_header(self) -> bool:
+        """校验文件头中的任务标识，文件不存在或为空时返回 False"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            first = f.readline()
+        if not first.strip():
+            return False
+        try:
+            job_id = json.loads(first).get("job")
+        except (json.JSONDecodeError, AttributeError):
+            job_id = None
+        if job_id != self.job_id:
+            raise ValueError(f"检查点 {self.path} 属于其他任务（{job_id}），当前任务为 {self.job_id}")
+        return True
+
+    def completed(self) -> Set[int]:
+        """
+        读取已完成的序号，忽略崩溃时写了一半的最后一行。
+
+        返回:
+            Set[int]: 已完成的序号集合
+        """
+        done = set()
+        for record in self.records():
+            done.add(record["index"])
+        return done
+
+    def records(self):
+        """
+        逐条读取检查点中的结果。
+
+        生成:
+            dict: {"index": 序号, "output": 输出文本}
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if "index" in record:
+                    yield record
+
+    def write(self, index: int, output: str):
+        """
+        追加一条结果并立即刷新到磁盘。
+        """
+        if self._file is None:
+            self._file = open(self.path, "a" if self._has_header else "w", encoding="utf-8")
+            if not self._has_header:
+                self._file.write(json.dumps({"job": self.job_id}) + "\n")
+                self._has_header = True
+        self._file.write(json.dumps({"index": index, "output": output}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _output_tokens(result) -> Optional[int]:
+    """从模型返回的消息中读取输出 token 数，优先使用 Ollama 的 eval_count"""
+    metadata = getattr(result, "response_metadata", None) or {}
+    if metadata.get("eval_count"):
+        return metadata["eval_count"]
+    usage = getattr(result, "usage_metadata", None) or {}
+    return usage.get("output_tokens") or None
+
+
+class AsyncBatchRunner:
+    """
+    大批量异步调用模型。
+
+    - 同时在途的请求数由 AdaptiveConcurrency 控制，随耗时和错误自动调整
+    - 结果按完成顺序返回，附带输入中的序号
+    - 成功的结果写入检查点文件，重新运行同一任务时跳过已完成的序号
+    - 输入可以是迭代器，按需取数，10 万条提示词也不需要一次性创建全部任务
+    """
+
+    def __init__(self, model: Runnable, max_concurrency: int = 4, checkpoint_path: Optional[str] = None,
+                 job_id: Optional[str] = None, max_retries: int = 3, adaptive: bool = True,
+                 concurrency: Optional[AdaptiveConcurrency] = None):
+        """
+        参数:
+            model (Runnable): 模型或链，如 ChatOllama
+            max_concurrency (int): 最大并发数，应与 OLLAMA_NUM_PARALLEL 一致；自适应调整只会在此之下减小再恢复
+            checkpoint_path (Optional[str]): 检查点文件路径，None 表示不保存进度
+            job_id (Optional[str]): 任务标识，写入检查点文件头；不传时按输入列表计算指纹，输入为迭代器时必须传入
+            max_retries (int): 单条请求失败后的重试次数
+            adaptive (bool): 是否根据耗时和错误调整并发数，False 时固定为 max_concurrency
+            concurrency (Optional[AdaptiveConcurrency]): 自定义的并发控制器
+        """
+        self.model = model
+        self.max_retries = max_retries
+        self.adaptive = adaptive
+        self.concurrency = concurrency or AdaptiveConcurrency(initial=max_concurrency, maximum=max_concurrency)
+        self.checkpoint_path = checkpoint_path
+        self.job_id = job_id
+        self.checkpoint: Optional[Checkpoint] = None
+
+    async def _call(self, index: int, prompt) -> Tuple[int, object]:
+        """
+        调用一次模型，失败时指数退避重试；重试用尽后返回异常对象。
+        """
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                result = await self.model.ainvoke(prompt)
+            except Exception as e:
+                if self.adaptive:
+                    self.concurrency.observe(time.perf_counter() - start, ok=False)
+                if attempt == self.max_retries:
+                    return index, e
+                await asyncio.sleep(min(2 ** attempt, 30))
+                continue
+            if self.adaptive:
+                self.concurrency.observe(time.perf_counter() - start, tokens=_output_tokens(result))
+            return index, result
+
+    async def run(self, prompts: Iterable) -> AsyncIterator[Tuple[int, object]]:
+        """
+        执行全部请求，按完成顺序返回结果。
+
+        参数:
+            prompts (Iterable): 提示词序列，每个元素为 model.ainvoke 的输入
+
+        生成:
+            Tuple[int, object]: (序号, 结果)，重试用尽仍失败时结果为异常对象（不写入检查点）。
+            检查点中已完成的序号不会再次返回，可用 Checkpoint.records() 读取。
+        """
+        done = set()
+        if self.checkpoint_path:
+            job_id = self.job_id
+            if job_id is None:
+                if not isinstance(prompts, Sequence):
+                    raise ValueError("输入为迭代器时需要指定 job_id，用于校验检查点")
+                job_id = job_fingerprint(prompts)
+            self.checkpoint = Checkpoint(self.checkpoint_path, job_id)
+            done = self.checkpoint.completed()
+        pending = ((i, prompt) for i, prompt in enumerate(prompts) if i not in done)
+        tasks = set()
+        exhausted = False
+        try:
+            while True:
+                # 按当前并发上限补充任务
+                while not exhausted and len(tasks) < self.concurrency.limit:
+                    item = next(pending, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    tasks.add(asyncio.create_task(self._call(*item)))
+                if not tasks:
+                    break
+
+                finished, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    index, result = task.result()
+                    if self.checkpoint and not isinstance(result, Exception):
+                        self.checkpoint.write(index, getattr(result, "content", result))
+                    yield index, result
+        finally:
+            # 调用方提前停止迭代时取消在途请求
+            for task in tasks:
+                task.cancel()
+            if self.checkpoint:
+                self.checkpoint.close()
+
+
+if __name__ == "__main__":
+    from langchain_ollama import ChatOllama
+
+    # 设置本地模型，不使用深度思考
+    model = ChatOllama(base_url="http://localhost:11434", model="qwen3:14b", reasoning=False)
+    topics = ["LangChain", "Python生成器", "Docker", "Kubernetes", "Redis", "向量数据库"]
+    questions = [f"用一句话解释：{topic}" for topic in topics * 10]
+
+    async def main():
+        runner = AsyncBatchRunner(model, max_concurrency=4, checkpoint_path="batch_checkpoint.jsonl")
+        start = time.perf_counter()
+        count = 0
+        async for index, result in runner.run(questions):
+            count += 1
+            if isinstance(result, Exception):
+                print(f"[{index}] 失败：{result}")
+            else:
+                print(f"[{index}] 并发 {runner.concurrency.limit} | {result.content[:40]}")
+        print(f"本次完成 {count} 条，耗时 {time.perf_counter() - start:.1f}s")
+
+    asyncio.run(main())
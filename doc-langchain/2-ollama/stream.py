@@ -3,16 +3,22 @@
 from langchain_core.messages import SystemMessage, HumanMessage
 from langchain_ollama import ChatOllama
 
+from streamMetrics import StreamStats, instrument_stream, registry
+
 # 设置本地模型，不使用深度思考
 model = ChatOllama(base_url="http://localhost:11434", model="qwen3:14b", reasoning=False)
 # 构建消息列表
 messages = [SystemMessage(content="你叫小亮，是一个乐于助人的人工助手"),
             HumanMessage(content="你是谁")
             ]
-# 流式调用大模型
-response = model.stream(messages)
+# 流式调用大模型，同时统计首字延迟、逐字间隔和生成速度
+stats = StreamStats(model.model)
+response = instrument_stream(model, messages, stats=stats)
 # 流式打印结果
 for chunk in response:
     print(chunk.content, end="",flush=True) # 刷新缓冲区 (无换行符，缓冲区未刷新，内容可能不会立即显示)
 print("\n")
-print(type(response))
\ No newline at end of file
+print(type(response))
+# 本次调用的统计，以及汇总后的 Prometheus 格式指标
+print(stats.summary())
+print(registry.render_prometheus())
\ No newline at end of file
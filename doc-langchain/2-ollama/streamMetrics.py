@@ -0,0 +1,274 @@
+# 流式输出性能统计：首字延迟、逐字间隔、生成速度，以及 Ollama 的预填充/解码耗时
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+# 直方图分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 生成速度分桶（token/秒）
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 500)
+
+
+class Histogram:
+    """
+    固定分桶的直方图，记录一次只做一次二分查找，可导出为 Prometheus 格式。
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按分桶上界估算分位数"""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return self.buckets[i] if i < len(self.buckets) else float("inf")
+        return float("inf")
+
+
+class MetricsRegistry:
+    """
+    进程内的指标汇总，按模型名分别统计。
+
+    snapshot() 返回字典，render_prometheus() 返回 Prometheus 文本格式，
+    可直接挂到 FastAPI 的 /metrics 路由上供 Prometheus 抓取。
+    """
+
+    HISTOGRAMS = {
+        "llm_stream_ttft_seconds": LATENCY_BUCKETS,
+        "llm_stream_inter_token_seconds": LATENCY_BUCKETS,
+        "llm_stream_tokens_per_second": RATE_BUCKETS,
+        "llm_prompt_eval_seconds": LATENCY_BUCKETS,
+        "llm_eval_seconds": LATENCY_BUCKETS,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._counters: Dict[tuple, float] = {}
+
+    def _histogram(self, name: str, model: str) -> Histogram:
+        key = (name, model)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(self.HISTOGRAMS[name])
+        return histogram
+
+    def record(self, stats: "StreamStats"):
+        """
+        汇总一次流式调用的统计结果（每次调用结束时执行一次）。
+        """
+        model = stats.model
+        with self._lock:
+            for name, value in (("llm_streams_total", 1), ("llm_stream_tokens_total", stats.tokens),
+                                ("llm_stream_errors_total", 1 if stats.error else 0)):
+                self._counters[(name, model)] = self._counters.get((name, model), 0) + value
+            if stats.ttft is not None:
+                self._histogram("llm_stream_ttft_seconds", model).observe(stats.ttft)
+            inter_token = self._histogram("llm_stream_inter_token_seconds", model)
+            for gap in stats.gaps:
+                inter_token.observe(gap)
+            if stats.tokens_per_second:
+                self._histogram("llm_stream_tokens_per_second", model).observe(stats.tokens_per_second)
+            if stats.prompt_eval_seconds is not None:
+                self._histogram("llm_prompt_eval_seconds", model).observe(stats.prompt_eval_seconds)
+            if stats.eval_seconds is not None:
+                self._histogram("llm_eval_seconds", model).observe(stats.eval_seconds)
+
+    def snapshot(self) -> dict:
+        """
+        返回:
+            dict: {模型名: {指标名: 计数值 或 {count, sum, p50, p99}}}
+        """
+        result = {}
+        with self._lock:
+            for (name, model), value in self._counters.items():
+                result.setdefault(model, {})[name] = value
+            for (name, model), h in self._histograms.items():
+                result.setdefault(model, {})[name] = {
+                    "count": h.count, "sum": h.sum, "p50": h.quantile(0.5), "p99": h.quantile(0.99),
+                }
+        return result
+
+    def render_prometheus(self) -> str:
+        """
+        返回:
+            str: Prometheus 文本格式的全部指标
+        """
+        lines = []
+        with self._lock:
+            for (name, model), value in sorted(self._counters.items()):
+                lines.append(f'{name}{{model="{model}"}} {value}')
+            for (name, model), h in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, c in zip(h.buckets + ("+Inf",), h.counts):
+                    cumulative += c
+                    lines.append(f'{name}_bucket{{model="{model}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{model="{model}"}} {h.sum}')
+                lines.append(f'{name}_count{{model="{model}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+# 默认的全局指标汇总
+registry = MetricsRegistry()
+
+
+class StreamStats:
+    """
+    一次流式调用的统计结果。
+
+    每个块只记录一次时间戳差值，分位数等在调用结束后再计算。
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.start: Optional[float] = None
+        self.ttft: Optional[float] = None
+        self.total: Optional[float] = None
+        self.gaps = array("d")
+        self.chunks = 0
+        self.tokens = 0
+        self.error: Optional[BaseException] = None
+        # Ollama 在最后一个块的 response_metadata 中返回的服务端耗时（秒）
+        self.prompt_eval_seconds: Optional[float] = None
+        self.eval_seconds: Optional[float] = None
+        self.prompt_tokens: Optional[int] = None
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """解码阶段的生成速度：优先使用 Ollama 的 eval 耗时，否则按首字之后的客户端耗时计算"""
+        if self.eval_seconds:
+            return self.tokens / self.eval_seconds
+        if self.total is not None and self.ttft is not None and self.total > self.ttft:
+            return max(self.tokens - 1, 0) / (self.total - self.ttft)
+        return None
+
+    def percentile(self, q: float) -> Optional[float]:
+        """逐字间隔的分位数"""
+        if not self.gaps:
+            return None
+        ordered = sorted(self.gaps)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def _on_chunk(self, chunk, now: float):
+        content = chunk if isinstance(chunk, str) else getattr(chunk, "content", None)
+        if content:
+            # 只有带内容的块参与计时，结尾只带元数据的空块不算
+            if self.ttft is None:
+                self.ttft = now - self.start
+            else:
+                self.gaps.append(now - self._last)
+            self._last = now
+            self.chunks += 1
+        metadata = getattr(chunk, "response_metadata", None)
+        if metadata and "eval_duration" in metadata:
+            self._on_ollama_metadata(metadata, getattr(chunk, "usage_metadata", None))
+
+    def _on_ollama_metadata(self, metadata: dict, usage: Optional[dict]):
+        # Ollama 的耗时单位为纳秒
+        if metadata.get("prompt_eval_duration") is not None:
+            self.prompt_eval_seconds = metadata["prompt_eval_duration"] / 1e9
+        if metadata.get("eval_duration") is not None:
+            self.eval_seconds = metadata["eval_duration"] / 1e9
+        self.prompt_tokens = metadata.get("prompt_eval_count")
+        if metadata.get("eval_count") is not None:
+            self.tokens = metadata["eval_count"]
+        elif usage:
+            self.tokens = usage.get("output_tokens", self.tokens)
+
+    def _finish(self, now: float, error: Optional[BaseException] = None):
+        self.total = now - self.start
+        self.error = error
+        if not self.tokens:
+            # 没有服务端统计时，以非空块数近似 token 数（Ollama 基本是一个块一个 token）
+            self.tokens = self.chunks
+
+    def summary(self) -> str:
+        """一行可读的统计摘要"""
+        parts = [f"首字 {self.ttft * 1000:.0f}ms" if self.ttft is not None else "首字 -",
+                 f"总耗时 {self.total:.2f}s" if self.total is not None else "",
+                 f"tokens {self.tokens}"]
+        if self.tokens_per_second:
+            parts.append(f"{self.tokens_per_second:.1f} tokens/s")
+        if self.gaps:
+            parts.append(f"逐字间隔 p50 {self.percentile(0.5) * 1000:.1f}ms p99 {self.percentile(0.99) * 1000:.1f}ms")
+        if self.prompt_eval_seconds is not None:
+            parts.append(f"预填充 {self.prompt_eval_seconds:.2f}s({self.prompt_tokens} tokens)")
+        if self.eval_seconds is not None:
+            parts.append(f"解码 {self.eval_seconds:.2f}s")
+        return "，".join(p for p in parts if p)
+
+
+def _model_name(model) -> str:
+    return getattr(model, "model", None) or getattr(model, "model_name", None) or type(model).__name__
+
+
+def instrument_stream(model, input, metrics: MetricsRegistry = registry, stats: Optional[StreamStats] = None,
+                      **kwargs) -> Iterator:
+    """
+    调用 model.stream 并统计性能，块原样返回。
+
+    参数:
+        model: 任意聊天模型或链
+        input: model.stream 的输入
+        metrics (MetricsRegistry): 汇总指标的位置
+        stats (Optional[StreamStats]): 传入时把本次统计写入该对象，便于调用方读取
+        **kwargs: 传给 model.stream 的其他参数
+
+    生成:
+        与 model.stream 相同的块
+    """
+    stats = stats or StreamStats(_model_name(model))
+    clock = time.perf_counter
+    stats.start = clock()
+    error = None
+    try:
+        for chunk in model.stream(input, **kwargs):
+            stats._on_chunk(chunk, clock())
+            yield chunk
+    except BaseException as e:
+        # 调用方提前停止迭代不算错误
+        if not isinstance(e, GeneratorExit):
+            error = e
+        raise
+    finally:
+        stats._finish(clock(), error)
+        metrics.record(stats)
+
+
+async def ainstrument_stream(model, input, metrics: MetricsRegistry = registry, stats: Optional[StreamStats] = None,
+                             **kwargs) -> AsyncIterator:
+    """
+    instrument_stream 的异步版本，调用 model.astream。
+    """
+    stats = stats or StreamStats(_model_name(model))
+    clock = time.perf_counter
+    stats.start = clock()
+    error = None
+    try:
+        async for chunk in model.astream(input, **kwargs):
+            stats._on_chunk(chunk, clock())
+            yield chunk
+    except BaseException as e:
+        # 调用方提前停止迭代不算错误
+        if not isinstance(e, GeneratorExit):
+            error = e
+        raise
+    finally:
+        stats._finish(clock(), error)
+        metrics.record(stats)
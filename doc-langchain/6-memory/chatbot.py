@@ -4,6 +4,9 @@ from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_community.chat_message_histories import RedisChatMessageHistory
 import gradio as gr
+import redis
+
+from historyCodec import MessageCodec
 
 # 定义不同角色的系统提示语
 ROLES = {
@@ -13,9 +16,56 @@ ROLES = {
     "代码审查员": "你是严格的代码审查员，指出代码问题并给出改进建议。",
 }
 
+# 同时处理的聊天请求数，多个用户可以同时流式输出
+CONCURRENCY_LIMIT = 8
+# 会话历史的过期时间（秒）：每个浏览器会话、每个角色各有一个 key，页面关闭后不再使用，到期自动删除
+HISTORY_TTL = 24 * 3600
+
 # 初始化大语言模型实例
 llm = ChatOllama(model="qwen3:8b", reasoning=False)
 
+# 所有会话共用一个 Redis 连接池，避免每轮对话新建连接
+redis_pool = redis.ConnectionPool.from_url('redis://localhost:6379/0', max_connections=CONCURRENCY_LIMIT * 2)
+redis_client = redis.Redis(connection_pool=redis_pool)
+# 消息以 msgpack 紧凑格式保存，兼容读取旧的 JSON 记录
+codec = MessageCodec()
+
+
+class PooledRedisChatMessageHistory(RedisChatMessageHistory):
+    """
+    复用共享 Redis 客户端的消息历史记录。
+
+    RedisChatMessageHistory 每次实例化都会根据 url 新建客户端和连接池，
+    这里直接注入共享客户端，key 格式保持不变；消息使用 MessageCodec 紧凑编码。
+    """
+
+    def __init__(self, session_id: str, client: redis.Redis, key_prefix: str = "chat:", ttl=None,
+                 codec: MessageCodec = codec):
+        """
+        参数:
+            session_id (str): 会话唯一标识符。
+            client (redis.Redis): 共享的 Redis 客户端。
+            key_prefix (str): key 前缀。
+            ttl: 过期时间（秒），None 表示不过期。
+            codec (MessageCodec): 消息编解码器。
+        """
+        self.redis_client = client
+        self.session_id = session_id
+        self.key_prefix = key_prefix
+        self.ttl = ttl
+        self.codec = codec
+
+    @property
+    def messages(self):
+        """从 Redis 读取消息（LPUSH 写入，需要倒序），兼容旧的 JSON 记录"""
+        return self.codec.decode_many(self.redis_client.lrange(self.key, 0, -1)[::-1])
+
+    def add_message(self, message) -> None:
+        """追加一条消息"""
+        self.redis_client.lpush(self.key, self.codec.encode(message))
+        if self.ttl:
+            self.redis_client.expire(self.key, self.ttl)
+
 
 def get_session_history(session_id: str) -> RedisChatMessageHistory:
     """
@@ -27,11 +77,11 @@ def get_session_history(session_id: str) -> RedisChatMessageHistory:
     返回:
         RedisChatMessageHistory: 与该会话关联的聊天历史对象。
     """
-    return RedisChatMessageHistory(
+    return PooledRedisChatMessageHistory(
         session_id=session_id,
-        url='redis://localhost:6379/0',
+        client=redis_client,
         key_prefix="chat:",
-        ttl=None
+        ttl=HISTORY_TTL
     )
 
 
@@ -55,7 +105,19 @@ def build_chain(role: str):
     return prompt | llm
 
 
-def chat_fn(message, history, role):
+# 启动时为每个角色构建一次带历史的链，聊天时直接复用
+CHAINS = {
+    role: RunnableWithMessageHistory(
+        build_chain(role),
+        get_session_history,
+        input_messages_key="question",
+        history_messages_key="history"
+    )
+    for role in ROLES
+}
+
+
+def chat_fn(message, history, role, request: gr.Request):
     """
     处理用户的聊天消息，并流式返回响应结果。
 
@@ -63,18 +125,16 @@ def chat_fn(message, history, role):
         message (str): 用户发送的消息内容。
         history (list): 当前对话的历史记录。
         role (str): 当前使用的角色名称。
+        request (gr.Request): Gradio 自动注入的请求对象，用于区分不同用户。
 
     生成:
         tuple: 更新后的聊天记录和清空输入框的内容。
     """
-    chain_with_history = RunnableWithMessageHistory(
-        build_chain(role),
-        get_session_history,
-        input_messages_key="question",
-        history_messages_key="history"
-    )
+    chain_with_history = CHAINS[role]
     partial = ""
-    config = RunnableConfig(configurable={"session_id": role})
+    # 每个浏览器会话 + 角色使用独立的历史记录，多个用户并发聊天时互不干扰
+    session_id = f"{request.session_hash}:{role}" if request and request.session_hash else role
+    config = RunnableConfig(configurable={"session_id": session_id})
     for chunk in chain_with_history.stream({"question": message}, config):
         partial += chunk.content
         yield history + [
@@ -136,6 +196,9 @@ with gr.Blocks(title="多角色聊天") as demo:
             outputs=[current_role_display, chatbot, current_role_state]
         )
 
+# 开启队列并允许多个请求同时执行，流式输出互不阻塞
+demo.queue(default_concurrency_limit=CONCURRENCY_LIMIT)
+
 # 启动 Gradio 应用
 if __name__ == "__main__":
     demo.launch()
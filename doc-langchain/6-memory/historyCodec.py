@@ -0,0 +1,188 @@
+import json
+import time
+from typing import Iterable, List, Optional, Union
+
+import msgpack
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+# 编码格式标记（首字节），旧版 JSON 记录以 "{" 开头，不会与这里冲突
+RAW = 0x01
+ZSTD = 0x02
+
+
+def _field_defaults(cls) -> dict:
+    """获取消息类各个可选字段的默认值"""
+    defaults = {}
+    for name, field in cls.model_fields.items():
+        if not field.is_required():
+            defaults[name] = field.get_default(call_default_factory=True)
+    return defaults
+
+
+class MessageCodec:
+    """
+    紧凑的会话消息编解码器
+
+    - 使用 msgpack 代替 JSON，只保存与字段默认值不同的字段（空的 additional_kwargs、
+      response_metadata、name 等都不写入）
+    - 可选使用 zstd + 共享字典压缩，短消息单独压缩效果也很好；压缩后更大时保存原始数据
+    - 解码时兼容 message_to_dict + json.dumps 写入的旧记录
+    """
+
+    def __init__(self, zstd_dict: Optional[bytes] = None, level: int = 3):
+        """
+        参数:
+            zstd_dict (Optional[bytes]): zstd 共享字典，可用 train_dictionary 生成，None 表示不压缩
+            level (int): zstd 压缩级别
+        """
+        self._defaults = {}
+        self._compressor = None
+        self._decompressor = None
+        if zstd_dict is not None:
+            import zstandard
+
+            dict_data = zstandard.ZstdCompressionDict(zstd_dict)
+            self._compressor = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+            self._decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+
+    def _pack(self, message: BaseMessage) -> bytes:
+        """把消息转为只含非默认字段的 msgpack 数据"""
+        cls = type(message)
+        defaults = self._defaults.get(cls)
+        if defaults is None:
+            defaults = self._defaults[cls] = _field_defaults(cls)
+        data = message.model_dump()
+        record = {"type": data.pop("type"), "content": data.pop("content")}
+        for name, value in data.items():
+            if name not in defaults or value != defaults[name]:
+                record[name] = value
+        return msgpack.packb(record, use_bin_type=True)
+
+    def encode(self, message: BaseMessage) -> bytes:
+        """
+        编码单条消息
+
+        参数:
+            message (BaseMessage): 消息对象
+
+        返回:
+            bytes: 编码后的数据
+        """
+        packed = self._pack(message)
+        if self._compressor is not None:
+            compressed = self._compressor.compress(packed)
+            if len(compressed) < len(packed):
+                return bytes([ZSTD]) + compressed
+        return bytes([RAW]) + packed
+
+    def decode(self, raw: Union[bytes, str]) -> BaseMessage:
+        """
+        解码单条消息，兼容旧版 JSON 记录
+
+        参数:
+            raw (Union[bytes, str]): Redis 中读出的数据
+
+        返回:
+            BaseMessage: 消息对象
+        """
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        marker = raw[0]
+        if marker == RAW:
+            record = msgpack.unpackb(raw[1:], raw=False)
+        elif marker == ZSTD:
+            if self._decompressor is None:
+                raise ValueError("记录使用 zstd 压缩，但编解码器没有配置字典")
+            record = msgpack.unpackb(self._decompressor.decompress(raw[1:]), raw=False)
+        else:
+            return messages_from_dict([json.loads(raw)])[0]
+        return messages_from_dict([{"type": record.pop("type"), "data": record}])[0]
+
+    def decode_many(self, items: Iterable[Union[bytes, str]]) -> List[BaseMessage]:
+        """批量解码"""
+        return [self.decode(item) for item in items]
+
+    def train_dictionary(self, messages: Iterable[BaseMessage], dict_size: int = 16 * 1024) -> bytes:
+        """
+        用历史消息样本训练 zstd 共享字典
+
+        参数:
+            messages (Iterable[BaseMessage]): 样本消息，建议几千条以上
+            dict_size (int): 字典大小（字节）
+
+        返回:
+            bytes: 字典数据，传给 MessageCodec(zstd_dict=...) 使用
+        """
+        import zstandard
+
+        samples = [self._pack(m) for m in messages]
+        return zstandard.train_dictionary(dict_size, samples).as_bytes()
+
+
+if __name__ == "__main__":
+    import random
+
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    # 构造与 ChatOllama 实际返回结构一致的客服对话
+    questions = ["外卖超时了可以赔付吗", "怎么修改收货地址", "在线支付取消订单后钱怎么返还给我呢", "优惠券为什么不能用"]
+    answers = [
+        "您好，订单超时送达可以在订单详情页申请超时赔付，赔付金额会以红包形式发放到您的账户。",
+        "订单未被商家接单前可以在订单详情页修改收货地址，商家接单后请联系骑手或客服协助修改。",
+        "取消订单后，款项会按原支付路径退回，一般 1-3 个工作日到账，具体以银行处理时间为准。",
+        "优惠券有使用门槛和有效期限制，请确认订单金额满足条件且优惠券在有效期内。",
+    ]
+    rng = random.Random(0)
+    messages = []
+    for i in range(5000):
+        k = rng.randrange(len(questions))
+        messages.append(HumanMessage(content=questions[k]))
+        prompt_tokens, output_tokens = rng.randint(50, 400), rng.randint(30, 200)
+        messages.append(AIMessage(
+            content=answers[k],
+            id=f"run--{rng.getrandbits(128):032x}-0",
+            response_metadata={
+                "model": "qwen3:8b",
+                "created_at": f"2025-06-01T12:{i % 60:02d}:00.000000Z",
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": rng.randint(10 ** 9, 10 ** 10),
+                "load_duration": rng.randint(10 ** 6, 10 ** 8),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": rng.randint(10 ** 7, 10 ** 9),
+                "eval_count": output_tokens,
+                "eval_duration": rng.randint(10 ** 8, 10 ** 10),
+                "model_name": "qwen3:8b",
+            },
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+            },
+        ))
+
+    # 一半样本训练字典，另一半用于测试，避免字典直接记住测试数据
+    train, test = messages[:len(messages) // 2], messages[len(messages) // 2:]
+    plain = MessageCodec()
+    codecs = {"msgpack": plain}
+    try:
+        codecs["msgpack+zstd"] = MessageCodec(zstd_dict=plain.train_dictionary(train))
+    except ImportError as e:
+        print(f"跳过 zstd: {e}")
+
+    def bench(name, encode, decode):
+        start = time.perf_counter()
+        encoded = [encode(m) for m in test]
+        encode_cost = time.perf_counter() - start
+        start = time.perf_counter()
+        decoded = [decode(item) for item in encoded]
+        decode_cost = time.perf_counter() - start
+        assert decoded == test
+        size = sum(len(item) for item in encoded) / len(test)
+        print(f"{name:<14} {size:>8.1f} 字节/条  编码 {encode_cost / len(test) * 1e6:>6.1f} us/条  "
+              f"解码 {decode_cost / len(test) * 1e6:>6.1f} us/条")
+
+    # 旧格式：与 RedisChatMessageHistory 的写入方式相同
+    bench("json(旧格式)", lambda m: json.dumps(message_to_dict(m)).encode("utf-8"), plain.decode)
+    for name, codec in codecs.items():
+        bench(name, codec.encode, codec.decode)
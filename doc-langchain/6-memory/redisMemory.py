@@ -1,9 +1,10 @@
-from langchain_community.chat_message_histories import RedisChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnableConfig
 from langchain_ollama import ChatOllama
 from loguru import logger
+from historyCodec import MessageCodec
+from redisWindowHistory import WindowedRedisChatMessageHistory
 
 # Redis 配置
 REDIS_URL = "redis://localhost:6379/0"
@@ -20,25 +21,21 @@ prompt = ChatPromptTemplate.from_messages([
 # 保留的历史轮数
 k = 2
 
+# 消息以 msgpack 紧凑格式保存，兼容读取旧的 JSON 记录
+codec = MessageCodec()
 
-def get_session_history(session_id: str) -> RedisChatMessageHistory:
+
+def get_session_history(session_id: str) -> WindowedRedisChatMessageHistory:
     """获取或创建会话历史（使用 Redis）"""
-    # 创建 Redis 历史对象
-    history = RedisChatMessageHistory(
+    # 自动修剪：只保留最近 k 轮对话（2k 条消息），裁剪在写入时由 Redis 原子完成
+    return WindowedRedisChatMessageHistory(
         session_id=session_id,
         url=REDIS_URL,
-        ttl=3600  # 1小时过期
+        max_messages=k * 2,
+        ttl=3600,  # 1小时过期
+        codec=codec
     )
 
-    # 自动修剪：只保留最近 k 轮对话（2k 条消息）
-    if len(history.messages) > k * 2:
-        # 保留最近的消息
-        messages_to_keep = history.messages[-k * 2:]
-        history.clear()
-        history.add_messages(messages_to_keep)
-
-    return history
-
 
 # 创建带历史的链
 chain = RunnableWithMessageHistory(
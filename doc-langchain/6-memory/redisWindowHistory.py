@@ -0,0 +1,69 @@
+import json
+from typing import List, Optional, Sequence
+
+import redis
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from historyCodec import MessageCodec
+
+
+class WindowedRedisChatMessageHistory(BaseChatMessageHistory):
+    """
+    只保留最近 N 条消息的 Redis 会话历史
+
+    追加消息时在同一个 MULTI/EXEC 事务中执行 LPUSH + LTRIM + EXPIRE，
+    裁剪在服务端原子完成，一次往返，并发请求同一会话也不会互相覆盖；
+    读取时用 LRANGE 只取最新的 max_messages 条，不需要反序列化完整历史。
+
+    key（message_store:<session_id>）和存储顺序（最新的消息在表头）与
+    langchain_community 的 RedisChatMessageHistory 相同，原有会话可以直接继续使用；
+    使用 codec 写入的消息是 msgpack 格式，RedisChatMessageHistory 无法再读取。
+    """
+
+    def __init__(self, session_id: str, url: str = "redis://localhost:6379/0", max_messages: int = 4,
+                 ttl: Optional[int] = None, key_prefix: str = "message_store:",
+                 client: Optional[redis.Redis] = None, codec: Optional[MessageCodec] = None):
+        """
+        参数:
+            session_id (str): 会话 ID
+            url (str): Redis 连接地址
+            max_messages (int): 保留的最大消息数（k 轮对话为 2k 条）
+            ttl (Optional[int]): 过期时间（秒），每次写入时刷新，None 表示不过期
+            key_prefix (str): Redis key 前缀
+            client (Optional[redis.Redis]): 复用已有的 Redis 客户端，传入时忽略 url
+            codec (Optional[MessageCodec]): 紧凑编解码器，None 表示使用 JSON；读取时兼容旧的 JSON 记录
+        """
+        self.client = client or redis.Redis.from_url(url)
+        self.key = f"{key_prefix}{session_id}"
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.codec = codec
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        """获取最近 max_messages 条消息，按时间从旧到新排列"""
+        items = self.client.lrange(self.key, 0, self.max_messages - 1)[::-1]
+        if self.codec:
+            return self.codec.decode_many(items)
+        return messages_from_dict([json.loads(item) for item in items])
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """追加消息，并在同一事务中裁剪和刷新过期时间"""
+        if not messages:
+            return
+        if self.codec:
+            items = [self.codec.encode(m) for m in messages]
+        else:
+            items = [json.dumps(message_to_dict(m), ensure_ascii=False) for m in messages]
+        pipe = self.client.pipeline(transaction=True)
+        # 逐条 LPUSH 后最新的消息在表头，与 RedisChatMessageHistory 一致
+        pipe.lpush(self.key, *items)
+        pipe.ltrim(self.key, 0, self.max_messages - 1)
+        if self.ttl:
+            pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def clear(self) -> None:
+        """清空会话历史"""
+        self.client.delete(self.key)
@@ -0,0 +1,154 @@
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional, Sequence
+
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import BaseMessage
+
+
+class RingBufferChatMessageHistory(BaseChatMessageHistory):
+    """
+    固定容量的内存会话历史
+
+    使用 deque(maxlen) 作为环形缓冲区，追加消息时超出容量的旧消息自动丢弃，
+    裁剪为 O(1)，不需要 clear() + add_messages() 重建。
+    """
+
+    def __init__(self, max_messages: int, on_change=None):
+        """
+        参数:
+            max_messages (int): 保留的最大消息数
+            on_change: 消息数变化时的回调，参数为变化量，供会话存储统计总消息数
+        """
+        self._messages = deque(maxlen=max_messages)
+        self._on_change = on_change
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        """获取当前保留的消息"""
+        return list(self._messages)
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """追加消息，超出容量时丢弃最旧的消息"""
+        before = len(self._messages)
+        self._messages.extend(messages)
+        if self._on_change:
+            self._on_change(len(self._messages) - before)
+
+    def clear(self) -> None:
+        """清空会话历史"""
+        removed = len(self._messages)
+        self._messages.clear()
+        if self._on_change:
+            self._on_change(-removed)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+
+class SessionStore:
+    """
+    带淘汰策略的内存会话存储
+
+    - 每个会话使用 RingBufferChatMessageHistory，最多保留 max_messages_per_session 条消息
+    - 会话总数超过 max_sessions 时淘汰最久未使用的会话（LRU）
+    - 总消息数超过 max_total_messages 时同样按 LRU 淘汰会话
+    - 空闲超过 ttl 秒的会话在访问存储时被清理
+    """
+
+    def __init__(self, max_sessions: int = 1000, max_messages_per_session: int = 4,
+                 max_total_messages: int = 100_000, ttl: Optional[float] = 3600):
+        """
+        参数:
+            max_sessions (int): 最大会话数
+            max_messages_per_session (int): 每个会话保留的最大消息数（k 轮对话为 2k 条）
+            max_total_messages (int): 所有会话的消息总数上限
+            ttl (Optional[float]): 会话空闲过期时间（秒），None 表示不过期
+        """
+        self.max_sessions = max_sessions
+        self.max_messages_per_session = max_messages_per_session
+        self.max_total_messages = max_total_messages
+        self.ttl = ttl
+        self.total_messages = 0
+        self.evicted = 0
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()  # session_id -> (history, 最近访问时间)
+        self._lock = threading.RLock()
+
+    def _on_change(self, session_id: str, delta: int):
+        """累计消息总数，超出上限时淘汰会话；正在写入的会话不会被淘汰"""
+        with self._lock:
+            self.total_messages += delta
+            if session_id in self._sessions:
+                # 写入也算一次访问
+                history, _ = self._sessions.pop(session_id)
+                self._sessions[session_id] = (history, time.monotonic())
+            self._evict(keep=session_id)
+
+    def _drop(self, session_id: str):
+        """移除一个会话"""
+        history, _ = self._sessions.pop(session_id)
+        # 被淘汰的历史对象可能仍被调用方持有，断开回调避免影响统计
+        history._on_change = None
+        self.total_messages -= len(history)
+        self.evicted += 1
+
+    def _evict(self, keep: Optional[str] = None):
+        """清理过期会话，并按 LRU 淘汰超出数量或消息总数上限的会话"""
+        if self.ttl is not None:
+            deadline = time.monotonic() - self.ttl
+            # OrderedDict 按访问时间排序，最旧的在前面
+            while self._sessions:
+                session_id, (_, last_access) = next(iter(self._sessions.items()))
+                if last_access >= deadline or session_id == keep:
+                    break
+                self._drop(session_id)
+        while self._sessions and (len(self._sessions) > self.max_sessions
+                                  or self.total_messages > self.max_total_messages):
+            session_id = next(iter(self._sessions))
+            if session_id == keep:
+                # 当前正在使用的会话不淘汰，先移到末尾
+                self._sessions.move_to_end(session_id)
+                if len(self._sessions) == 1:
+                    break
+                continue
+            self._drop(session_id)
+
+    def get(self, session_id: str) -> RingBufferChatMessageHistory:
+        """
+        获取或创建会话历史，可直接作为 RunnableWithMessageHistory 的 get_session_history
+
+        参数:
+            session_id (str): 会话 ID
+
+        返回:
+            RingBufferChatMessageHistory: 会话历史
+        """
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            history = entry[0] if entry else RingBufferChatMessageHistory(
+                self.max_messages_per_session, on_change=functools.partial(self._on_change, session_id)
+            )
+            self._sessions[session_id] = (history, time.monotonic())
+            self._evict(keep=session_id)
+            return history
+
+    def stats(self) -> dict:
+        """
+        内存使用统计
+
+        返回:
+            dict: 会话数、消息总数、累计淘汰会话数，以及消息内容的估算字节数
+        """
+        with self._lock:
+            content_bytes = sum(
+                sys.getsizeof(m.content) for history, _ in self._sessions.values() for m in history._messages
+            )
+            return {
+                "sessions": len(self._sessions),
+                "messages": self.total_messages,
+                "evicted_sessions": self.evicted,
+                "content_bytes": content_bytes,
+            }
@@ -1,8 +1,8 @@
-from langchain_core.chat_history import InMemoryChatMessageHistory
 from langchain_core.runnables.history import RunnableWithMessageHistory
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.runnables import RunnableConfig
 from langchain_ollama import ChatOllama
+from sessionStore import SessionStore
 
 # 初始化模型
 llm = ChatOllama(model="qwen3:14b", reasoning=False)
@@ -13,27 +13,17 @@ prompt = ChatPromptTemplate.from_messages([
     ("human", "{question}")
 ])
 
-# 存储会话历史
-store = {}
-
 # 保留的历史轮数
 k = 2
 
+# 存储会话历史：每个会话只保留最近 k 轮对话（2k 条消息），
+# 会话数与消息总数有上限，空闲 1 小时的会话自动淘汰
+store = SessionStore(max_sessions=1000, max_messages_per_session=k * 2, ttl=3600)
 
-def get_session_history(session_id: str) -> InMemoryChatMessageHistory:
-    """获取或创建会话历史"""
-    if session_id not in store:
-        store[session_id] = InMemoryChatMessageHistory()
-
-    # 自动修剪：只保留最近 k 轮对话（2k 条消息）
-    history = store[session_id]
-    if len(history.messages) > k * 2:
-        # 保留最近的消息
-        messages_to_keep = history.messages[-k * 2:]
-        history.clear()
-        history.add_messages(messages_to_keep)
 
-    return history
+def get_session_history(session_id: str):
+    """获取或创建会话历史"""
+    return store.get(session_id)
 
 
 # 创建带历史的链
@@ -59,4 +49,5 @@ while True:
 
     # 可选：显示当前历史消息数
     history = get_session_history("demo")
-    print(f"[当前历史消息数: {len(history.messages)}]")
\ No newline at end of file
+    print(f"[当前历史消息数: {len(history.messages)}]")
+    print(f"[会话存储统计: {store.stats()}]")
\ No newline at end of file
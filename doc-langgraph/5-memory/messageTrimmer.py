@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.messages.utils import trim_messages, count_tokens_approximately
+
+
+class MessageTokenCache:
+    """
+    按消息 id 缓存 token 数
+
+    LangGraph 的 add_messages 会为每条消息分配 id，同一条消息在后续每一轮都会被重新计数，
+    缓存后每条消息只计算一次。同一 id 的消息被替换时，内容长度变化会使缓存失效。
+    缓存由所有 pre_model_hook 调用共享，读写都在锁内进行，token 计数本身在锁外完成。
+    """
+
+    def __init__(self, token_counter=count_tokens_approximately, max_size=100_000):
+        """
+        Args:
+            token_counter: 计算消息列表 token 数的函数
+            max_size (int): 最多缓存的消息数，超出时淘汰最久未使用的
+        """
+        self.token_counter = token_counter
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()  # message id -> (内容长度, token 数)
+        self._lock = threading.Lock()
+
+    def count(self, message):
+        """
+        获取单条消息的 token 数
+
+        Args:
+            message: 消息对象
+
+        Returns:
+            int: token 数
+        """
+        if message.id is None:
+            with self._lock:
+                self.misses += 1
+            return self.token_counter([message])
+        size = len(str(message.content))
+        with self._lock:
+            entry = self._cache.get(message.id)
+            if entry is not None and entry[0] == size:
+                self.hits += 1
+                self._cache.move_to_end(message.id)
+                return entry[1]
+            self.misses += 1
+        tokens = self.token_counter([message])
+        with self._lock:
+            self._cache[message.id] = (size, tokens)
+            self._cache.move_to_end(message.id)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def stats(self):
+        """
+        Returns:
+            dict: 缓存条目数、命中数、未命中数
+        """
+        with self._lock:
+            return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+def trim_last_messages(messages, max_tokens, cache, start_on="human", end_on=("human", "tool")):
+    """
+    保留最新的若干条消息，结果与 trim_messages(strategy="last", allow_partial=False) 一致
+
+    从最新一条消息向前遍历并累加 token 数，超出 max_tokens 立即停止，
+    只访问窗口内的消息，每轮的开销不随历史长度增长。
+
+    Args:
+        messages (list): 完整的消息列表
+        max_tokens (int): 最大 token 数
+        cache (MessageTokenCache): token 数缓存
+        start_on: 结果第一条消息的类型
+        end_on: 结果最后一条消息的类型
+
+    Returns:
+        list: 裁剪后的消息列表
+    """
+    start_on = (start_on,) if isinstance(start_on, str) else start_on
+    end_on = (end_on,) if isinstance(end_on, str) else end_on
+
+    # 跳过末尾不符合 end_on 的消息
+    end = len(messages)
+    while end > 0 and messages[end - 1].type not in end_on:
+        end -= 1
+
+    # 从后往前累加，直到超出上限
+    total = 0
+    begin = end
+    while begin > 0:
+        tokens = cache.count(messages[begin - 1])
+        if total + tokens > max_tokens:
+            break
+        total += tokens
+        begin -= 1
+
+    # 跳过开头不符合 start_on 的消息
+    while begin < end and messages[begin].type not in start_on:
+        begin += 1
+    return messages[begin:end]
+
+
+if __name__ == "__main__":
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    # 模拟一个长期运行的会话：每轮一问一答，每轮都裁剪一次
+    turns = 2000
+    max_tokens = 300
+    cache = MessageTokenCache()
+    history = []
+    full_cost = 0.0
+    incremental_cost = 0.0
+    for i in range(turns):
+        history.append(HumanMessage(f"第 {i} 个问题：我喜欢做的事是什么？" * 3, id=f"h{i}"))
+
+        start = time.perf_counter()
+        expected = trim_messages(
+            history,
+            strategy="last",
+            token_counter=count_tokens_approximately,
+            max_tokens=max_tokens,
+            start_on="human",
+            end_on=("human", "tool"),
+        )
+        full_cost += time.perf_counter() - start
+
+        start = time.perf_counter()
+        trimmed = trim_last_messages(history, max_tokens, cache)
+        incremental_cost += time.perf_counter() - start
+
+        assert [m.id for m in trimmed] == [m.id for m in expected]
+        history.append(AIMessage(f"第 {i} 个回答：你喜欢唱、跳、rap、篮球。" * 3, id=f"a{i}"))
+
+    print(f"轮数: {turns}，最终历史消息数: {len(history)}")
+    print(f"trim_messages 全量裁剪: 平均每轮 {full_cost / turns * 1000:.3f} ms")
+    print(f"增量裁剪: 平均每轮 {incremental_cost / turns * 1000:.3f} ms")
+    print(f"加速比: {full_cost / incremental_cost:.1f}x，缓存统计: {cache.stats()}")
@@ -1,8 +1,8 @@
 import dotenv
-from langchain_core.messages.utils import trim_messages, count_tokens_approximately
 from langchain_ollama import ChatOllama
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.prebuilt import create_react_agent
+from messageTrimmer import MessageTokenCache, trim_last_messages
 
 # 加载环境变量配置
 dotenv.load_dotenv()
@@ -10,6 +10,8 @@ dotenv.load_dotenv()
 model = ChatOllama(model="qwen3:14b", reasoning=False)
 # 定义工具列表，
 tools = []
+# 按消息 id 缓存 token 数，每条消息只计算一次
+token_cache = MessageTokenCache()
 
 
 def pre_model_hook(state):
@@ -26,17 +28,16 @@ def pre_model_hook(state):
     """
     # 参数说明:
     #   state["messages"]: 需要裁剪的消息列表
-    #   strategy: 裁剪策略，"last"表示从最后开始裁剪
-    #   token_counter: 用于计算token数量的函数，这里使用近似计算方法
     #   max_tokens: 最大token数量限制，设置为300
+    #   cache: token 数缓存，token 数使用近似计算方法
     #   start_on: 开始裁剪的消息类型，"human"表示从人类用户的消息开始
     #   end_on: 结束裁剪的消息类型，可以是"human"或"tool"类型的消息
-    # 返回值: 裁剪后的消息列表
-    trimmed_messages = trim_messages(
+    # 返回值: 裁剪后的消息列表，与 trim_messages(strategy="last") 一致，
+    # 但只从最新的消息向前遍历到超出上限为止，每轮开销不随历史长度增长
+    trimmed_messages = trim_last_messages(
         state["messages"],
-        strategy="last",
-        token_counter=count_tokens_approximately,
         max_tokens=300,
+        cache=token_cache,
         start_on="human",
         end_on=("human", "tool"),
     )
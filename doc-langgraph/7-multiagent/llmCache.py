@@ -0,0 +1,162 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+
+# 反序列化时只允许还原这些类型
+ALLOWED_OBJECTS = [Generation, ChatGeneration, AIMessage]
+
+
+class _KeyedLLMCache(BaseCache):
+    """
+    LLM 缓存的公共部分：缓存 key 的计算、结果序列化和命中率统计。
+
+    key 由 llm_string（模型名与调用参数）和规范化后的消息内容计算 sha256 得到；
+    消息 id 已由 LangChain 在查询前清除，这里再按 key 排序重新序列化，
+    保证内容相同的消息得到相同的 key。
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        try:
+            prompt = json.dumps(json.loads(prompt), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        except ValueError:
+            pass
+        return hashlib.sha256(f"{llm_string}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _record(self, hit: bool):
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> dict:
+        """
+        返回:
+            dict: 命中数、未命中数和命中率
+        """
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_ratio": self.hits / total if total else 0.0}
+
+
+class SQLiteLLMCache(_KeyedLLMCache):
+    """
+    基于 SQLite 的 LLM 缓存。
+
+    - 条目超过 ttl 秒后失效，查询时惰性删除
+    - 条目数超过 max_entries 时按写入时间淘汰最旧的条目
+    - 不修改全局缓存，只对显式设置了 cache 的模型生效：
+        cached_model = chat_model.model_copy(update={"cache": SQLiteLLMCache()})
+    """
+
+    def __init__(self, database_path: str = ".llm_cache.db", ttl: Optional[float] = 7 * 24 * 3600,
+                 max_entries: int = 100_000):
+        """
+        参数:
+            database_path (str): SQLite 数据库文件路径
+            ttl (Optional[float]): 条目有效期（秒），None 表示不过期
+            max_entries (int): 最多保留的条目数
+        """
+        super().__init__()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_created_at ON llm_cache (created_at)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] < time.time():
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._count -= 1
+                row = None
+        self._record(row is not None)
+        return loads(row[0], allowed_objects=ALLOWED_OBJECTS) if row is not None else None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        key = self._key(prompt, llm_string)
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        value = dumps(list(return_val))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, expires_at),
+            )
+            # 只在未命中后写入，基本都是新增；并发覆盖导致的多计数会在淘汰时按实际条目数校正
+            self._count += 1
+            if self._count > self.max_entries:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        """删除过期条目，仍然超出上限时按写入时间删除最旧的 10%"""
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at < ?", (now,))
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_entries:
+            excess = count - self.max_entries + self.max_entries // 10
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created_at LIMIT ?)",
+                (excess,),
+            )
+            count -= excess
+        self._count = count
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._count = 0
+
+
+class RedisLLMCache(_KeyedLLMCache):
+    """
+    基于 Redis 的 LLM 缓存，多个进程或多台机器共享。
+
+    过期由 Redis 的 EX 完成；容量上限请通过 Redis 的 maxmemory + allkeys-lru 配置。
+    """
+
+    def __init__(self, redis_client, ttl: Optional[int] = 7 * 24 * 3600, key_prefix: str = "llm_cache:"):
+        """
+        参数:
+            redis_client: Redis 客户端
+            ttl (Optional[int]): 条目有效期（秒），None 表示不过期
+            key_prefix (str): Redis key 前缀
+        """
+        super().__init__()
+        self.redis = redis_client
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        value = self.redis.get(self.key_prefix + self._key(prompt, llm_string))
+        self._record(value is not None)
+        return loads(value, allowed_objects=ALLOWED_OBJECTS) if value is not None else None
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        self.redis.set(self.key_prefix + self._key(prompt, llm_string), dumps(list(return_val)), ex=self.ttl)
+
+    def clear(self, **kwargs) -> None:
+        for key in self.redis.scan_iter(match=f"{self.key_prefix}*", count=1000):
+            self.redis.delete(key)
@@ -7,8 +7,12 @@ from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from llm import chat_model
+from llmCache import SQLiteLLMCache
 from state import State
 
+# 问题分类结果只取决于问题本身，单独为分类链开启缓存，相同问题不再调用模型
+classify_model = chat_model.model_copy(update={"cache": SQLiteLLMCache(ttl=24 * 3600)})
+
 def supervisor_node(state: State) -> State | None:
     logger.info(f"[supervisor_node] 当前阶段: {state.phase}, State: {state}")
 
@@ -23,9 +27,10 @@ def supervisor_node(state: State) -> State | None:
             ("human", "用户提出的问题是：{question}")
         ])
         parser = StrOutputParser()
-        chain = chat_prompt | chat_model | parser
-        task_type = chain.invoke({"question": state.messages})
-        logger.info(f"问题分类结果: {task_type}")
+        chain = chat_prompt | classify_model | parser
+        # 只传最后一条问题的文本：消息列表的 repr 含有每条消息的 id，会让缓存 key 每次都不同
+        task_type = chain.invoke({"question": state.messages[-1].content})
+        logger.info(f"问题分类结果: {task_type}, 缓存统计: {classify_model.cache.stats()}")
         return State(messages=state.messages, type=task_type.strip(), phase="dispatch")
     elif state.phase == "gather":
         # 汇总阶段 -> 整理子Agent结果
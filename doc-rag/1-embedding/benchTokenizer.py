@@ -0,0 +1,59 @@
+# 对比分词器启动耗时：AutoTokenizer 立即加载 vs TokenizerRegistry 懒加载 tokenizer.json
+
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# 模型名要和 HF 对应，首次运行会下载到本地缓存，之后均从缓存读取
+MODEL_NAME = "Qwen/Qwen3-14B"
+# 每种方式重复启动的次数
+REPEAT = 5
+
+# 每次都在全新的 Python 进程中执行，模拟短生命周期的切分任务 / 工作进程
+EAGER_SCRIPT = f"""
+from transformers import AutoTokenizer
+tokenizer = AutoTokenizer.from_pretrained({MODEL_NAME!r}, trust_remote_code=True)
+len(tokenizer.encode("通用多模态表征模型示例"))
+"""
+
+LAZY_SCRIPT = f"""
+import sys
+sys.path.insert(0, {str(Path(__file__).parent)!r})
+from splitor import QwenTextSplitter
+splitter = QwenTextSplitter(model_name={MODEL_NAME!r})
+splitter.count_tokens("通用多模态表征模型示例")
+"""
+
+
+def measure(script: str) -> list:
+    """
+    在新进程中重复执行脚本并统计耗时。
+
+    参数:
+        script (str): 需要执行的 Python 代码。
+
+    返回:
+        list: 每次执行的耗时（秒）。
+    """
+    costs = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", script], check=True)
+        costs.append(time.perf_counter() - start)
+    return costs
+
+
+if __name__ == "__main__":
+    # 预热一次，确保 HF 缓存中已有模型文件，不把下载时间计入对比
+    subprocess.run([sys.executable, "-c", EAGER_SCRIPT], check=True)
+
+    eager = measure(EAGER_SCRIPT)
+    lazy = measure(LAZY_SCRIPT)
+
+    print(f"{'方式':<24}{'中位数(s)':>12}{'最小(s)':>12}")
+    print("-" * 48)
+    print(f"{'AutoTokenizer 立即加载':<24}{statistics.median(eager):>12.3f}{min(eager):>12.3f}")
+    print(f"{'tokenizer.json 懒加载':<24}{statistics.median(lazy):>12.3f}{min(lazy):>12.3f}")
+    print(f"加速比: {statistics.median(eager) / statistics.median(lazy):.1f}x")
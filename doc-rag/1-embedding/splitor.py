@@ -1,10 +1,67 @@
 # 通义千问进行Token长度切分
 
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.connection import wait
 from pathlib import Path
-from typing import List
-from transformers import AutoTokenizer
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from PyPDF2 import PdfReader
 
+def _pdf_worker_main(file_path: str, conn):
+    """
+    工作进程入口：独立打开一次 PDF 文件，循环接收页码并返回该页文本，收到 None 时退出。
+
+    参数:
+        file_path (str): PDF 文件的路径。
+        conn: 与主进程通信的管道端点。
+    """
+    reader = PdfReader(file_path)
+    while True:
+        page_index = conn.recv()
+        if page_index is None:
+            break
+        try:
+            conn.send((page_index, reader.pages[page_index].extract_text() or "", None))
+        except Exception as e:
+            conn.send((page_index, None, e))
+
+
+class _PdfWorker:
+    """
+    单个 PDF 提取进程，一次只处理一页，超时后可单独终止并替换。
+    """
+
+    def __init__(self, file_path: str):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_pdf_worker_main, args=(file_path, child_conn), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.page_index: Optional[int] = None
+        self.deadline: Optional[float] = None
+
+    def submit(self, page_index: int, timeout: Optional[float]):
+        self.conn.send(page_index)
+        self.page_index = page_index
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+
+    def close(self, kill: bool = False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.process.join(timeout=None if kill else 1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
 
 class DocumentLoader:
     """
@@ -27,21 +84,97 @@ class DocumentLoader:
             return f.read()
 
     @staticmethod
-    def load_pdf(file_path: str) -> str:
+    def load_pdf(file_path: str, workers: int = 1, page_timeout: Optional[float] = None) -> str:
         """
         加载 PDF 文件内容。
 
         参数:
             file_path (str): PDF 文件的路径。
+            workers (int): 并行提取的工作进程数，默认为 1（串行）。
+            page_timeout (Optional[float]): 单页提取的超时时间（秒），默认为 None（不限时）。
 
         返回:
             str: 提取的 PDF 文本内容，各页之间以换行符连接。
         """
-        reader = PdfReader(file_path)
-        text = []
-        for page in reader.pages:
-            text.append(page.extract_text() or "")
-        return "\n".join(text)
+        return "\n".join(DocumentLoader.iter_pdf_pages(file_path, workers, page_timeout))
+
+    @staticmethod
+    def iter_pdf_pages(file_path: str, workers: int = 1, page_timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        按页码顺序逐页返回 PDF 文本，可使用多个工作进程并行提取。
+
+        每个工作进程独立打开文件，一次只处理一页；结果按页码顺序产出。
+        设置了 page_timeout 时，提取在工作进程中进行（workers 小于等于 1 时使用一个工作进程）：
+        某一页超时后该页返回空字符串，卡住的进程被立即终止并替换为新进程，
+        工作进程数保持不变，后续页不受影响。
+
+        参数:
+            file_path (str): PDF 文件的路径。
+            workers (int): 工作进程数，小于等于 1 且未设置 page_timeout 时在当前进程串行提取，默认为 1。
+            page_timeout (Optional[float]): 单页提取的超时时间（秒），默认为 None（不限时）。
+
+        返回:
+            Iterator[str]: 按页码顺序产出的每页文本。
+        """
+        if workers <= 1 and page_timeout is None:
+            for page in PdfReader(file_path).pages:
+                yield page.extract_text() or ""
+            return
+
+        page_count = len(PdfReader(file_path).pages)
+        workers = max(1, min(workers, page_count, os.cpu_count() or 1))
+        if workers <= 1 and page_timeout is None:
+            yield from DocumentLoader.iter_pdf_pages(file_path, 1)
+            return
+
+        idle = [_PdfWorker(file_path) for _ in range(workers)]
+        busy: Dict[object, _PdfWorker] = {}
+        results: Dict[int, str] = {}
+        next_page = 0
+        next_yield = 0
+        try:
+            while next_yield < page_count:
+                while idle and next_page < page_count:
+                    worker = idle.pop()
+                    worker.submit(next_page, page_timeout)
+                    busy[worker.conn] = worker
+                    next_page += 1
+
+                deadlines = [w.deadline for w in busy.values() if w.deadline is not None]
+                timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+                for conn in wait(list(busy), timeout):
+                    worker = busy.pop(conn)
+                    try:
+                        page_index, text, error = conn.recv()
+                    except EOFError:
+                        # 工作进程异常退出（如解析时崩溃），该页跳过并替换进程
+                        print(f"⚠️ 第 {worker.page_index + 1} 页提取时工作进程退出，已跳过")
+                        results[worker.page_index] = ""
+                        worker.close(kill=True)
+                        idle.append(_PdfWorker(file_path))
+                        continue
+                    if error is not None:
+                        raise error
+                    results[page_index] = text
+                    idle.append(worker)
+
+                now = time.monotonic()
+                for conn, worker in list(busy.items()):
+                    if worker.deadline is not None and worker.deadline <= now:
+                        print(f"⚠️ 第 {worker.page_index + 1} 页提取超时，已跳过")
+                        results[worker.page_index] = ""
+                        del busy[conn]
+                        worker.close(kill=True)
+                        idle.append(_PdfWorker(file_path))
+
+                while next_yield in results:
+                    yield results.pop(next_yield)
+                    next_yield += 1
+        finally:
+            for worker in busy.values():
+                worker.close(kill=True)
+            for worker in idle:
+                worker.close()
 
     @staticmethod
     def load_md(file_path: str) -> str:
@@ -81,22 +214,278 @@ class DocumentLoader:
             raise ValueError(f"不支持的文件格式: {ext}")
 
 
+class FastTokenizer:
+    """
+    基于 tokenizers 库加载 tokenizer.json 的轻量分词器，
+    提供与 transformers 分词器一致的 encode/decode 接口。
+
+    属性:
+        tokenizer: tokenizers.Tokenizer 对象。
+    """
+
+    def __init__(self, tokenizer_file: str):
+        """
+        从预先序列化的 tokenizer.json 加载分词器。
+
+        参数:
+            tokenizer_file (str): tokenizer.json 文件路径。
+        """
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_file)
+
+    def encode(self, text: str) -> List[int]:
+        """
+        将文本编码为 token id 列表。
+
+        参数:
+            text (str): 输入文本。
+
+        返回:
+            List[int]: token id 列表。
+        """
+        return self.tokenizer.encode(text).ids
+
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """
+        在一次调用中批量编码多段文本。
+
+        参数:
+            texts (List[str]): 输入文本列表。
+
+        返回:
+            List[List[int]]: 每段文本对应的 token id 列表。
+        """
+        return [encoding.ids for encoding in self.tokenizer.encode_batch(texts)]
+
+    def decode(self, token_ids: List[int]) -> str:
+        """
+        将 token id 列表解码为文本。
+
+        参数:
+            token_ids (List[int]): token id 列表。
+
+        返回:
+            str: 解码后的文本。
+        """
+        return self.tokenizer.decode(token_ids, skip_special_tokens=False)
+
+
+class TokenizerRegistry:
+    """
+    进程级分词器注册表：按模型名称懒加载并缓存分词器。
+
+    首次使用时才加载；优先读取 tokenizer.json 构建 FastTokenizer，
+    只有找不到该文件或加载失败时才导入 transformers 使用 AutoTokenizer。
+    注册表是模块级全局对象，fork 出的工作进程会直接继承已加载的分词器，
+    spawn 出的进程则在首次使用时各自加载一次。
+    """
+
+    _tokenizers: Dict[str, object] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _find_tokenizer_file(model_name: str) -> Optional[str]:
+        """
+        查找模型对应的 tokenizer.json 文件。
+
+        参数:
+            model_name (str): 本地模型目录或 HF 模型名称。
+
+        返回:
+            Optional[str]: tokenizer.json 的本地路径，找不到时返回 None。
+        """
+        local_file = Path(model_name) / "tokenizer.json"
+        if local_file.is_file():
+            return str(local_file)
+        try:
+            from huggingface_hub import hf_hub_download
+
+            return hf_hub_download(repo_id=model_name, filename="tokenizer.json")
+        except Exception:
+            return None
+
+    @staticmethod
+    def get(model_name: str):
+        """
+        获取指定模型的分词器，未加载时进行加载。
+
+        参数:
+            model_name (str): 本地模型目录或 HF 模型名称。
+
+        返回:
+            FastTokenizer | PreTrainedTokenizer: 分词器对象。
+        """
+        tokenizer = TokenizerRegistry._tokenizers.get(model_name)
+        if tokenizer is not None:
+            return tokenizer
+
+        with TokenizerRegistry._lock:
+            tokenizer = TokenizerRegistry._tokenizers.get(model_name)
+            if tokenizer is None:
+                tokenizer = TokenizerRegistry._load(model_name)
+                TokenizerRegistry._tokenizers[model_name] = tokenizer
+        return tokenizer
+
+    @staticmethod
+    def _load(model_name: str):
+        """
+        加载分词器：优先 tokenizer.json，失败时回退到 transformers。
+
+        参数:
+            model_name (str): 本地模型目录或 HF 模型名称。
+
+        返回:
+            FastTokenizer | PreTrainedTokenizer: 分词器对象。
+        """
+        tokenizer_file = TokenizerRegistry._find_tokenizer_file(model_name)
+        if tokenizer_file:
+            try:
+                return FastTokenizer(tokenizer_file)
+            except Exception as e:
+                print(f"⚠️ 加载 {tokenizer_file} 失败，回退到 AutoTokenizer: {e}")
+
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+
+    @staticmethod
+    def preload(*model_names: str):
+        """
+        预先加载分词器，可作为进程池的 initializer 使用。
+
+        参数:
+            model_names (str): 需要预加载的模型名称。
+        """
+        for model_name in model_names:
+            TokenizerRegistry.get(model_name)
+
+
+class TokenCountCache:
+    """
+    进程级 token 计数缓存：以 (分词器 id, 文本哈希) 为键的有界 LRU。
+
+    只保存文本摘要而不保存原文，重复出现的 FAQ 答案、聊天消息无需再次编码。
+    同时统计命中/未命中次数，便于根据命中率调整缓存容量。
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        """
+        初始化缓存。
+
+        参数:
+            maxsize (int): 最多缓存的条目数，默认为 100000。
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Tuple[str, bytes], int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(tokenizer_id: str, text: str) -> Tuple[str, bytes]:
+        """
+        生成缓存键。
+
+        参数:
+            tokenizer_id (str): 分词器标识（模型名称）。
+            text (str): 输入文本。
+
+        返回:
+            Tuple[str, bytes]: 分词器标识与文本 blake2b 摘要组成的键。
+        """
+        return tokenizer_id, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[int]:
+        """
+        读取缓存并更新命中统计。
+
+        参数:
+            key (Tuple[str, bytes]): 缓存键。
+
+        返回:
+            Optional[int]: 缓存的 token 数量，未命中时返回 None。
+        """
+        with self._lock:
+            count = self._data.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: Tuple[str, bytes], count: int):
+        """
+        写入缓存，超出容量时淘汰最久未使用的条目。
+
+        参数:
+            key (Tuple[str, bytes]): 缓存键。
+            count (int): token 数量。
+        """
+        with self._lock:
+            self._data[key] = count
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """
+        清空缓存并重置统计。
+        """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        返回缓存统计信息。
+
+        返回:
+            dict: 包含 hits、misses、hit_rate、size、maxsize 的字典。
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+# 所有 QwenTextSplitter 实例共享的 token 计数缓存
+token_count_cache = TokenCountCache()
+
+
 class QwenTextSplitter:
     """
     基于指定模型的 tokenizer 对文本进行切分的工具类。
 
+    分词器通过 TokenizerRegistry 在首次使用时懒加载，实例本身只保存模型名称，
+    因此创建开销很小，也可以直接序列化传递给工作进程。
+
     属性:
-        tokenizer: 使用的分词器对象。
+        model_name: 用于加载 tokenizer 的模型名称。
     """
 
     def __init__(self, model_name: str = "Qwen/Qwen2.5-7B"):
         """
-        初始化分词器。
+        初始化分词器配置（不会立即加载分词器）。
 
         参数:
             model_name (str): 用于加载 tokenizer 的模型名称，默认为 "Qwen/Qwen2.5-7B"。
         """
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
+        self.model_name = model_name
+
+    @property
+    def tokenizer(self):
+        """
+        使用的分词器对象，首次访问时从注册表懒加载。
+        """
+        return TokenizerRegistry.get(self.model_name)
 
     def count_tokens(self, text: str) -> int:
         """
@@ -108,7 +497,55 @@ class QwenTextSplitter:
         返回:
             int: 文本的 token 数量。
         """
-        return len(self.tokenizer.encode(text))
+        key = TokenCountCache.make_key(self.model_name, text)
+        count = token_count_cache.get(key)
+        if count is None:
+            count = len(self.tokenizer.encode(text))
+            token_count_cache.put(key, count)
+        return count
+
+    def count_tokens_many(self, texts: Iterable[str]) -> List[int]:
+        """
+        批量计算多段文本的 token 数量，未命中缓存的文本在一次分词器调用中编码。
+
+        参数:
+            texts (Iterable[str]): 输入文本集合。
+
+        返回:
+            List[int]: 与输入顺序一致的 token 数量列表。
+        """
+        texts = list(texts)
+        keys = [TokenCountCache.make_key(self.model_name, text) for text in texts]
+        counts = [token_count_cache.get(key) for key in keys]
+
+        # 同一批次中重复的文本只编码一次
+        missing = {}
+        for i, count in enumerate(counts):
+            if count is None:
+                missing.setdefault(keys[i], texts[i])
+        if missing:
+            tokenizer = self.tokenizer
+            batch = list(missing.values())
+            if hasattr(tokenizer, "encode_batch"):
+                encoded = tokenizer.encode_batch(batch)
+            else:
+                encoded = tokenizer(batch)["input_ids"]
+            computed = {}
+            for key, token_ids in zip(missing.keys(), encoded):
+                computed[key] = len(token_ids)
+                token_count_cache.put(key, len(token_ids))
+            counts = [computed[keys[i]] if count is None else count for i, count in enumerate(counts)]
+        return counts
+
+    @staticmethod
+    def cache_stats() -> dict:
+        """
+        返回共享 token 计数缓存的命中统计。
+
+        返回:
+            dict: 包含 hits、misses、hit_rate、size、maxsize 的字典。
+        """
+        return token_count_cache.stats()
 
     def split_by_tokens(self, text: str, max_tokens: int = 500, overlap: int = 50) -> List[str]:
         """
@@ -142,6 +579,8 @@ if __name__ == "__main__":
     # 初始化文本切分器并统计原始 token 数量
     splitter = QwenTextSplitter(model_name="Qwen/Qwen3-14B")  # 模型名要和 HF 对应
     print("原始 Token 数:", splitter.count_tokens(text))
+    print("各段落 Token 数:", splitter.count_tokens_many(text.split("\n\n"))[:10])
+    print("Token 计数缓存:", splitter.cache_stats())
 
     # 按 token 切分文本
     chunks = splitter.split_by_tokens(text, max_tokens=300, overlap=50)
@@ -0,0 +1,323 @@
+# 向量数据库横向对比：Redis / Weaviate / FAISS / InMemoryVectorStore
+# 指标：写入速率、不同 k 下的查询 p50/p99、相对精确检索的召回率、常驻内存
+# install
+# pip install numpy redis weaviate-client faiss-cpu langchain-community psutil
+
+import os
+import time
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from embeddingStore import EmbeddingStore
+
+# ========== 配置 ==========
+# 合成语料的向量条数、维度；STORE_PATH 不为空时改用 EmbeddingStore 中的真实向量
+CORPUS_SIZE = 20000
+VECTOR_DIM = 1024
+STORE_PATH = None
+# 查询条数与不同的 k
+QUERY_COUNT = 200
+TOP_KS = (1, 10, 50)
+# 结果表输出文件
+REPORT_FILE = "bench_vector_store.md"
+
+
+# ========== 数据准备 ==========
+def make_corpus(n: int, dim: int, clusters: int = 64, seed: int = 42) -> np.ndarray:
+    """
+    生成带聚类结构的归一化合成向量，比纯随机向量更接近真实 embedding 分布。
+
+    参数:
+        n (int): 向量条数。
+        dim (int): 向量维度。
+        clusters (int): 聚类中心数量，默认为 64。
+        seed (int): 随机种子，默认为 42。
+
+    返回:
+        np.ndarray: 形状为 (n, dim) 的 float32 矩阵。
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, clusters, n)] + 0.5 * rng.standard_normal((n, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_topk(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """
+    暴力计算余弦相似度，得到每条查询的真实 top-k，作为召回率的基准。
+
+    参数:
+        vectors (np.ndarray): 已归一化的语料向量。
+        queries (np.ndarray): 已归一化的查询向量。
+        k (int): 返回结果数量。
+
+    返回:
+        List[set]: 每条查询对应的 top-k 行号集合（字符串形式）。
+    """
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [{str(i) for i in row} for row in top]
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    当前进程的常驻内存（需要 psutil），不可用时返回 None。
+    """
+    try:
+        import psutil
+
+        return psutil.Process(os.getpid()).memory_info().rss
+    except ImportError:
+        return None
+
+
+class LookupEmbeddings(Embeddings):
+    """
+    按文本查表返回预先计算好的向量，让 LangChain 向量库直接使用基准语料而无需调用模型。
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.vectors[int(t)].tolist() for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.vectors[int(text)].tolist()
+
+
+# ========== 各向量库适配 ==========
+class InMemoryBackend:
+    """
+    langchain_core 的 InMemoryVectorStore（8-ollama/embedding/app.py 中使用）。
+    """
+    name = "InMemory"
+
+    def setup(self, vectors: np.ndarray):
+        from langchain_core.vectorstores import InMemoryVectorStore
+
+        self.store = InMemoryVectorStore(LookupEmbeddings(vectors))
+        self._rss = rss_bytes()
+
+    def ingest(self, vectors: np.ndarray):
+        docs = [Document(page_content=str(i), id=str(i)) for i in range(len(vectors))]
+        self.store.add_documents(docs, ids=[d.id for d in docs])
+
+    def query(self, vector: np.ndarray, k: int) -> List[str]:
+        return [d.page_content for d in self.store.similarity_search_by_vector(vector.tolist(), k=k)]
+
+    def memory(self) -> Optional[int]:
+        rss = rss_bytes()
+        return rss - self._rss if rss is not None and self._rss is not None else None
+
+    def teardown(self):
+        self.store = None
+
+
+class FaissBackend(InMemoryBackend):
+    """
+    langchain_community 的 FAISS（3-prompt/3-fewshot/exampleSelectors.py 中使用）。
+    """
+    name = "FAISS"
+
+    def setup(self, vectors: np.ndarray):
+        import faiss  # noqa: F401 未安装时直接跳过该向量库
+
+        self.embedding = LookupEmbeddings(vectors)
+        self._rss = rss_bytes()
+
+    def ingest(self, vectors: np.ndarray):
+        from langchain_community.vectorstores import FAISS
+
+        pairs = [(str(i), vector.tolist()) for i, vector in enumerate(vectors)]
+        self.store = FAISS.from_embeddings(pairs, self.embedding, distance_strategy="MAX_INNER_PRODUCT")
+
+    def query(self, vector: np.ndarray, k: int) -> List[str]:
+        return [d.page_content for d, _ in self.store.similarity_search_with_score_by_vector(vector.tolist(), k=k)]
+
+
+class RedisBackend:
+    """
+    RediSearch HNSW 索引（2-vectorStore/redisStack.py 中使用）。
+    """
+    name = "Redis"
+    index_name = "bench_index"
+    prefix = "bench:"
+
+    def setup(self, vectors: np.ndarray):
+        import redis
+        from redis.commands.search.field import VectorField
+        from redis.commands.search.index_definition import IndexDefinition
+
+        self.client = redis.Redis(host="localhost", port=6379, decode_responses=False)
+        self.client.ping()
+        self.teardown()
+        self._used = int(self.client.info("memory")["used_memory"])
+        self.client.ft(self.index_name).create_index(
+            [VectorField("embedding", "HNSW",
+                         {"TYPE": "FLOAT32", "DIM": vectors.shape[1], "DISTANCE_METRIC": "COSINE"})],
+            definition=IndexDefinition(prefix=[self.prefix])
+        )
+
+    def ingest(self, vectors: np.ndarray):
+        pipe = self.client.pipeline(transaction=False)
+        for i, vector in enumerate(vectors):
+            pipe.hset(f"{self.prefix}{i}", mapping={"embedding": vector.astype(np.float32).tobytes()})
+            if i % 1000 == 999:
+                pipe.execute()
+        pipe.execute()
+        # 等待后台建索引完成，否则查询会漏掉尚未索引的数据
+        while int(self.client.ft(self.index_name).info().get("indexing", 0)):
+            time.sleep(0.1)
+
+    def query(self, vector: np.ndarray, k: int) -> List[str]:
+        from redis.commands.search.query import Query
+
+        q = Query(f"*=>[KNN {k} @embedding $vec_param]").sort_by("__embedding_score").paging(0, k).no_content()
+        result = self.client.ft(self.index_name).search(
+            q, query_params={"vec_param": vector.astype(np.float32).tobytes()}
+        )
+        ids = [doc.id.decode() if isinstance(doc.id, bytes) else doc.id for doc in result.docs]
+        return [doc_id.removeprefix(self.prefix) for doc_id in ids]
+
+    def memory(self) -> Optional[int]:
+        return int(self.client.info("memory")["used_memory"]) - self._used
+
+    def teardown(self):
+        try:
+            self.client.ft(self.index_name).dropindex(delete_documents=True)
+        except Exception:
+            pass
+
+
+class WeaviateBackend:
+    """
+    Weaviate（2-vectorStore/weaviate.py 中使用），写入走 WeaviateBulkLoader 并发批量导入。
+    """
+    name = "Weaviate"
+    collection_name = "BenchVectors"
+
+    def setup(self, vectors: np.ndarray):
+        import weaviate
+
+        self.client = weaviate.connect_to_local(host="localhost", port=8080, grpc_port=50051)
+        try:
+            self._drop_collection()
+            self.collection = self.client.collections.create(self.collection_name)
+        except Exception:
+            # 连接成功但建集合失败时 run_backend 不会调用 teardown，这里先关闭连接
+            self.client.close()
+            raise
+
+    def ingest(self, vectors: np.ndarray):
+        from weaviateImport import WeaviateBulkLoader
+
+        objects = ({"properties": {"row": i}, "vector": vector} for i, vector in enumerate(vectors))
+        WeaviateBulkLoader(self.collection, report_every=60).load(objects)
+
+    def query(self, vector: np.ndarray, k: int) -> List[str]:
+        result = self.collection.query.near_vector(near_vector=vector.tolist(), limit=k)
+        return [str(int(o.properties["row"])) for o in result.objects]
+
+    def memory(self) -> Optional[int]:
+        # Weaviate 运行在独立进程/容器中，这里无法直接测得
+        return None
+
+    def _drop_collection(self):
+        if self.client.collections.exists(self.collection_name):
+            self.client.collections.delete(self.collection_name)
+
+    def teardown(self):
+        try:
+            self._drop_collection()
+        finally:
+            self.client.close()
+
+
+# ========== 压测 ==========
+def run_backend(backend, vectors: np.ndarray, queries: np.ndarray, truths: dict) -> Optional[dict]:
+    """
+    对单个向量库执行写入与查询压测，不可用的向量库返回 None。
+
+    参数:
+        backend: 向量库适配对象。
+        vectors (np.ndarray): 语料向量。
+        queries (np.ndarray): 查询向量。
+        truths (dict): k -> 精确检索结果。
+
+    返回:
+        Optional[dict]: 该向量库的各项指标。
+    """
+    try:
+        backend.setup(vectors)
+    except Exception as e:
+        print(f"⏭️ 跳过 {backend.name}: {e}")
+        return None
+
+    try:
+        start = time.perf_counter()
+        backend.ingest(vectors)
+        ingest_rate = len(vectors) / (time.perf_counter() - start)
+        memory = backend.memory()
+
+        row = {"backend": backend.name, "ingest": ingest_rate, "memory": memory}
+        for k in TOP_KS:
+            latencies, hits = [], 0
+            for query, truth in zip(queries, truths[k]):
+                t0 = time.perf_counter()
+                found = backend.query(query, k)
+                latencies.append(time.perf_counter() - t0)
+                hits += len(truth.intersection(found))
+            row[f"p50@{k}"] = np.percentile(latencies, 50) * 1000
+            row[f"p99@{k}"] = np.percentile(latencies, 99) * 1000
+            row[f"recall@{k}"] = hits / (k * len(queries))
+        print(f"✅ {backend.name} 完成")
+        return row
+    finally:
+        backend.teardown()
+
+
+def format_table(rows: List[dict]) -> str:
+    """
+    把压测结果格式化为 Markdown 表格。
+    """
+    headers = ["向量库", "写入(条/秒)", "内存(MB)"]
+    for k in TOP_KS:
+        headers += [f"p50@{k}(ms)", f"p99@{k}(ms)", f"recall@{k}"]
+    lines = ["| " + " | ".join(headers) + " |", "|" + "---|" * len(headers)]
+    for row in rows:
+        memory = f"{row['memory'] / 2 ** 20:.1f}" if row["memory"] is not None else "-"
+        cells = [row["backend"], f"{row['ingest']:.0f}", memory]
+        for k in TOP_KS:
+            cells += [f"{row[f'p50@{k}']:.2f}", f"{row[f'p99@{k}']:.2f}", f"{row[f'recall@{k}']:.3f}"]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if STORE_PATH:
+        vectors = np.asarray(EmbeddingStore(STORE_PATH).vectors(), dtype=np.float32)
+        vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    else:
+        vectors = make_corpus(CORPUS_SIZE, VECTOR_DIM)
+    # 查询取语料中的向量加少量扰动
+    rng = np.random.default_rng(0)
+    queries = vectors[rng.integers(0, len(vectors), QUERY_COUNT)]
+    queries = queries + 0.05 * rng.standard_normal(queries.shape, dtype=np.float32)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    truths = {k: exact_topk(vectors, queries, k) for k in TOP_KS}
+
+    rows = []
+    for backend in (InMemoryBackend(), FaissBackend(), RedisBackend(), WeaviateBackend()):
+        row = run_backend(backend, vectors, queries, truths)
+        if row:
+            rows.append(row)
+
+    table = format_table(rows)
+    print(table)
+    with open(REPORT_FILE, "w", encoding="utf-8") as f:
+        f.write(f"语料: {len(vectors)} 条 x {vectors.shape[1]} 维，查询: {len(queries)} 条\n\n{table}\n")
+    print(f"结果已写入 {REPORT_FILE}")
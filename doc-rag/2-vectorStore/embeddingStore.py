@@ -0,0 +1,293 @@
+# 基于内存映射文件的向量落盘存储，供离线相似度计算 / 聚类任务使用
+# install
+# pip install numpy redis
+
+import json
+import os
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 向量矩阵、id/元数据表、存储信息的文件名
+VECTOR_FILE = "vectors.f32"
+META_FILE = "meta.jsonl"
+INFO_FILE = "info.json"
+
+
+class EmbeddingStore:
+    """
+    只追加写入的向量存储。
+
+    目录结构:
+        vectors.f32: 按行连续存放的 float32 向量矩阵（无文件头，可直接 memmap）
+        meta.jsonl:  与向量逐行对应的 id 和元数据
+        info.json:   向量维度等存储信息
+
+    读取时通过 np.memmap 零拷贝打开向量矩阵，不会把百万级向量整体加载进内存。
+    """
+
+    def __init__(self, path: str, dim: Optional[int] = None):
+        """
+        打开或创建向量存储。
+
+        参数:
+            path (str): 存储目录。
+            dim (Optional[int]): 向量维度，新建存储时可不传，首次写入时自动确定。
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.dim = dim
+
+        info_path = os.path.join(path, INFO_FILE)
+        if os.path.exists(info_path):
+            with open(info_path, "r", encoding="utf-8") as f:
+                stored_dim = json.load(f)["dim"]
+            if dim is not None and dim != stored_dim:
+                raise ValueError(f"向量维度不一致: 存储为 {stored_dim}, 传入 {dim}")
+            self.dim = stored_dim
+        elif dim is not None:
+            self._write_info()
+
+        self._ids: Optional[List[str]] = None
+        self._id_index: Optional[dict] = None
+
+    def _file(self, name: str) -> str:
+        """
+        返回存储目录下指定文件的路径。
+        """
+        return os.path.join(self.path, name)
+
+    def _write_info(self):
+        """
+        写入存储信息文件。
+        """
+        with open(self._file(INFO_FILE), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "dtype": "float32"}, f)
+
+    def __len__(self) -> int:
+        """
+        已写入的向量条数，以向量文件大小为准。
+        """
+        if self.dim is None or not os.path.exists(self._file(VECTOR_FILE)):
+            return 0
+        return os.path.getsize(self._file(VECTOR_FILE)) // (self.dim * 4)
+
+    def append(self, ids: Sequence[str], vectors, metadatas: Optional[Sequence[dict]] = None) -> int:
+        """
+        追加一批向量及其 id/元数据。
+
+        参数:
+            ids (Sequence[str]): 向量 id 列表。
+            vectors: 形状为 (n, dim) 的向量，可以是 numpy 数组或 list[list[float]]。
+            metadatas (Optional[Sequence[dict]]): 每条向量对应的元数据，默认为空字典。
+
+        返回:
+            int: 追加后的向量总数。
+        """
+        matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        if len(ids) != len(matrix):
+            raise ValueError(f"id 数量({len(ids)})与向量数量({len(matrix)})不一致")
+        if metadatas is not None and len(metadatas) != len(ids):
+            raise ValueError(f"元数据数量({len(metadatas)})与 id 数量({len(ids)})不一致")
+
+        if self.dim is None:
+            self.dim = matrix.shape[1]
+            self._write_info()
+        elif matrix.shape[1] != self.dim:
+            raise ValueError(f"向量维度不一致: 存储为 {self.dim}, 传入 {matrix.shape[1]}")
+
+        with open(self._file(VECTOR_FILE), "ab") as f:
+            f.write(matrix.tobytes())
+        with open(self._file(META_FILE), "a", encoding="utf-8") as f:
+            for i, vec_id in enumerate(ids):
+                metadata = metadatas[i] if metadatas is not None else {}
+                f.write(json.dumps({"id": vec_id, "metadata": metadata}, ensure_ascii=False) + "\n")
+
+        if self._ids is not None:
+            self._ids.extend(ids)
+            self._id_index = None
+        return len(self)
+
+    def vectors(self) -> np.ndarray:
+        """
+        以只读内存映射方式打开向量矩阵（零拷贝）。
+
+        返回:
+            np.ndarray: 形状为 (n, dim) 的 float32 memmap，空存储时返回空数组。
+        """
+        count = len(self)
+        if count == 0:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.memmap(self._file(VECTOR_FILE), dtype=np.float32, mode="r", shape=(count, self.dim))
+
+    def ids(self) -> List[str]:
+        """
+        返回全部向量 id（首次调用时从 meta.jsonl 读取并缓存）。
+
+        返回:
+            List[str]: 与向量矩阵行号一一对应的 id 列表。
+        """
+        if self._ids is None:
+            self._ids = [record["id"] for record in self.iter_metadata()]
+        return self._ids
+
+    def iter_metadata(self) -> Iterator[dict]:
+        """
+        逐行读取 id/元数据记录，不会一次性读入整个元数据表。
+
+        返回:
+            Iterator[dict]: 形如 {"id": ..., "metadata": {...}} 的记录。
+        """
+        if not os.path.exists(self._file(META_FILE)):
+            return
+        with open(self._file(META_FILE), "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def index_of(self, vec_id: str) -> int:
+        """
+        根据 id 查找向量所在行号。
+
+        参数:
+            vec_id (str): 向量 id。
+
+        返回:
+            int: 行号，不存在时抛出 KeyError。
+        """
+        if self._id_index is None:
+            self._id_index = {v: i for i, v in enumerate(self.ids())}
+        return self._id_index[vec_id]
+
+    def iter_batches(self, batch_size: int = 65536) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        按行分块遍历向量矩阵，适合流式计算。
+
+        参数:
+            batch_size (int): 每块的行数，默认为 65536。
+
+        返回:
+            Iterator[Tuple[int, np.ndarray]]: (起始行号, 向量块视图)。
+        """
+        matrix = self.vectors()
+        for start in range(0, len(matrix), batch_size):
+            yield start, matrix[start:start + batch_size]
+
+    def search(self, query, k: int = 10, batch_size: int = 65536) -> List[Tuple[str, float]]:
+        """
+        分块精确计算余弦相似度，返回最相似的 k 条。
+
+        参数:
+            query: 查询向量。
+            k (int): 返回结果数量，默认为 10。
+            batch_size (int): 每次参与计算的行数，控制峰值内存，默认为 65536。
+
+        返回:
+            List[Tuple[str, float]]: (id, 余弦相似度) 列表，按相似度从高到低排序。
+        """
+        q = np.asarray(query, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start, block in self.iter_batches(batch_size):
+            norms = np.linalg.norm(block, axis=1)
+            norms[norms == 0] = 1.0
+            scores = (block @ q) / norms
+            rows = np.arange(start, start + len(block))
+            # 合并上一轮的候选后只保留前 k 个
+            scores = np.concatenate([best_scores, scores])
+            rows = np.concatenate([best_rows, rows])
+            top = np.argpartition(-scores, min(k, len(scores)) - 1)[:k]
+            best_scores, best_rows = scores[top], rows[top]
+
+        order = np.argsort(-best_scores)
+        ids = self.ids()
+        return [(ids[best_rows[i]], float(best_scores[i])) for i in order]
+
+
+def _decode(value: bytes):
+    """
+    尝试把 Redis 返回的字节解码为字符串，无法解码时原样返回。
+    """
+    try:
+        return value.decode("utf-8")
+    except UnicodeDecodeError:
+        return value
+
+
+def export_from_redis(redis_client, store: EmbeddingStore,
+                      pattern: str = "doc:*",
+                      vector_field: str = "embedding",
+                      batch_size: int = 1000) -> int:
+    """
+    把 Redis 中一类 key 的向量 Hash 批量导出到向量存储。
+
+    使用 SCAN 遍历 key，并通过 pipeline 成批执行 HGETALL，避免逐条往返。
+    向量字段按 float32 原始字节直接写入，其余字段作为元数据保存。
+    不同前缀的数据通常来自不同的 Embedding 模型、维度不同，每个 pattern 应导出到单独的存储。
+
+    参数:
+        redis_client: redis.Redis 客户端，需设置 decode_responses=False。
+        store (EmbeddingStore): 目标向量存储。
+        pattern (str): 需要导出的 key 模式，默认为 "doc:*"。
+        vector_field (str): 向量字段名，默认为 "embedding"。
+        batch_size (int): 每批处理的 key 数量，默认为 1000。
+
+    返回:
+        int: 导出的向量条数。
+    """
+
+    def flush(keys: List[bytes]) -> int:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        ids, vectors, metadatas = [], [], []
+        for key, fields in zip(keys, pipe.execute()):
+            vector = fields.pop(vector_field.encode(), None)
+            if vector is None:
+                continue
+            ids.append(_decode(key))
+            vectors.append(np.frombuffer(vector, dtype=np.float32))
+            # 无法按 utf-8 解码的二进制字段不写入元数据
+            metadata = {_decode(k): _decode(v) for k, v in fields.items()}
+            metadatas.append({k: v for k, v in metadata.items() if isinstance(v, str)})
+        if ids:
+            store.append(ids, np.vstack(vectors), metadatas)
+        return len(ids)
+
+    total = 0
+    keys = []
+    for key in redis_client.scan_iter(match=pattern, count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            total += flush(keys)
+            keys = []
+    if keys:
+        total += flush(keys)
+    print(f"✅ 已导出 {pattern}，共 {total} 条")
+    return total
+
+
+# ========== 使用示例 ==========
+if __name__ == "__main__":
+    import redis
+
+    # 存向量要关掉 decode
+    redis_client = redis.Redis(host="localhost", port=6379, decode_responses=False)
+
+    # doc:* 为 DashScope 向量，faq:* 为 Ollama 向量，维度不同，分别导出到各自的存储
+    for name in ("doc", "faq"):
+        store = EmbeddingStore(os.path.join("embedding_store", name))
+        export_from_redis(redis_client, store, pattern=f"{name}:*")
+
+        # 零拷贝打开向量矩阵，用于离线分析
+        matrix = store.vectors()
+        print(f"[{name}] 向量条数: {len(store)}, 维度: {store.dim}, 类型: {type(matrix).__name__}")
+
+        # 以第一条向量为查询做精确检索
+        if len(store):
+            for vec_id, score in store.search(matrix[0], k=3):
+                print(f"{vec_id}: {score:.4f}")
@@ -0,0 +1,202 @@
+# Redis 向量索引快照：把 doc:* / faq:* Hash 导出为紧凑的分块二进制文件，重启后快速恢复
+# 向量字段保存原始 float32 字节，文本字段使用 zlib 压缩；恢复时通过 pipeline 批量 HSET
+
+import struct
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, List, Tuple
+
+# 文件头标识
+MAGIC = b"RVSNAP1\n"
+# 块头：记录数、块数据长度
+CHUNK_HEADER = struct.Struct("<II")
+# 字段值标记：原始字节 / zlib 压缩
+RAW, COMPRESSED = 0, 1
+# 小于该长度的文本不压缩，压缩收益抵不过开销
+MIN_COMPRESS_SIZE = 64
+
+
+def _encode_record(key: bytes, fields: dict, vector_fields: set) -> bytes:
+    """
+    把一个 Hash 编码为二进制记录。
+
+    记录格式: key 长度(u16) + key + 字段数(u16) +
+             [字段名长度(u16) + 字段名 + 标记(u8) + 值长度(u32) + 值] * 字段数
+
+    参数:
+        key (bytes): Redis key。
+        fields (dict): HGETALL 返回的字段。
+        vector_fields (set): 保持原始字节的向量字段名。
+
+    返回:
+        bytes: 编码后的记录。
+    """
+    parts = [struct.pack("<H", len(key)), key, struct.pack("<H", len(fields))]
+    for name, value in fields.items():
+        flag = RAW
+        if name not in vector_fields and len(value) >= MIN_COMPRESS_SIZE:
+            value, flag = zlib.compress(value, 3), COMPRESSED
+        parts += [struct.pack("<H", len(name)), name, struct.pack("<BI", flag, len(value)), value]
+    return b"".join(parts)
+
+
+def _decode_chunk(payload: bytes, count: int) -> Iterator[Tuple[bytes, dict]]:
+    """
+    解析一个数据块中的全部记录。
+
+    参数:
+        payload (bytes): 块数据。
+        count (int): 块内记录数。
+
+    返回:
+        Iterator[Tuple[bytes, dict]]: (key, 字段字典)。
+    """
+    view = memoryview(payload)
+    pos = 0
+    for _ in range(count):
+        (key_len,) = struct.unpack_from("<H", view, pos)
+        pos += 2
+        key = bytes(view[pos:pos + key_len])
+        pos += key_len
+        (field_count,) = struct.unpack_from("<H", view, pos)
+        pos += 2
+        fields = {}
+        for _ in range(field_count):
+            (name_len,) = struct.unpack_from("<H", view, pos)
+            pos += 2
+            name = bytes(view[pos:pos + name_len])
+            pos += name_len
+            flag, value_len = struct.unpack_from("<BI", view, pos)
+            pos += 5
+            value = bytes(view[pos:pos + value_len])
+            pos += value_len
+            fields[name] = zlib.decompress(value) if flag == COMPRESSED else value
+        yield key, fields
+
+
+def _iter_chunks(file_path: str) -> Iterator[Tuple[int, bytes]]:
+    """
+    顺序读取快照文件中的数据块。
+
+    参数:
+        file_path (str): 快照文件路径。
+
+    返回:
+        Iterator[Tuple[int, bytes]]: (记录数, 块数据)。
+    """
+    with open(file_path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"不是有效的快照文件: {file_path}")
+        while True:
+            header = f.read(CHUNK_HEADER.size)
+            if not header:
+                return
+            count, length = CHUNK_HEADER.unpack(header)
+            yield count, f.read(length)
+
+
+def snapshot(redis_client, file_path: str, patterns: Iterable[str] = ("doc:*", "faq:*"),
+             vector_fields: Iterable[str] = ("embedding",), chunk_size: int = 1000) -> int:
+    """
+    导出匹配的 Hash 到快照文件。
+
+    参数:
+        redis_client: redis.Redis 客户端，需设置 decode_responses=False。
+        file_path (str): 快照文件路径。
+        patterns (Iterable[str]): 需要导出的 key 模式，默认为 ("doc:*", "faq:*")。
+        vector_fields (Iterable[str]): 向量字段名，默认为 ("embedding",)。
+        chunk_size (int): 每个数据块包含的 key 数，默认为 1000。
+
+    返回:
+        int: 导出的 key 数量。
+    """
+    vector_fields = {name.encode() for name in vector_fields}
+    total = 0
+    start = time.perf_counter()
+
+    with open(file_path, "wb") as f:
+        f.write(MAGIC)
+
+        def flush(keys: List[bytes]) -> int:
+            pipe = redis_client.pipeline(transaction=False)
+            for key in keys:
+                pipe.hgetall(key)
+            records = [
+                _encode_record(key, fields, vector_fields)
+                for key, fields in zip(keys, pipe.execute()) if fields
+            ]
+            payload = b"".join(records)
+            f.write(CHUNK_HEADER.pack(len(records), len(payload)))
+            f.write(payload)
+            return len(records)
+
+        for pattern in patterns:
+            keys = []
+            for key in redis_client.scan_iter(match=pattern, count=chunk_size):
+                keys.append(key)
+                if len(keys) >= chunk_size:
+                    total += flush(keys)
+                    keys = []
+            if keys:
+                total += flush(keys)
+
+    print(f"✅ 快照完成: {total} 个 key，耗时 {time.perf_counter() - start:.1f}s -> {file_path}")
+    return total
+
+
+def restore(redis_client, file_path: str, workers: int = 1) -> int:
+    """
+    从快照文件恢复 Hash。
+
+    每个数据块通过一次 pipeline 执行全部 HSET；workers 大于 1 时多个数据块并行写入。
+    若 Redis 重启后索引也丢失，需要先执行 redisStack.create_index 等建索引逻辑，
+    RediSearch 会在写入时自动为匹配前缀的 Hash 建立索引。
+
+    参数:
+        redis_client: redis.Redis 客户端（线程安全，可在多个工作线程中共用）。
+        file_path (str): 快照文件路径。
+        workers (int): 并行恢复的线程数，默认为 1。
+
+    返回:
+        int: 恢复的 key 数量。
+    """
+
+    def write_chunk(count: int, payload: bytes) -> int:
+        pipe = redis_client.pipeline(transaction=False)
+        for key, fields in _decode_chunk(payload, count):
+            pipe.hset(key, mapping=fields)
+        pipe.execute()
+        return count
+
+    total = 0
+    start = time.perf_counter()
+    if workers <= 1:
+        for count, payload in _iter_chunks(file_path):
+            total += write_chunk(count, payload)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for count, payload in _iter_chunks(file_path):
+                # 限制在途块数，避免把整个文件读进内存
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    total += sum(future.result() for future in done)
+                pending.add(executor.submit(write_chunk, count, payload))
+            total += sum(future.result() for future in pending)
+
+    print(f"✅ 恢复完成: {total} 个 key，耗时 {time.perf_counter() - start:.1f}s")
+    return total
+
+
+# ========== 使用示例 ==========
+if __name__ == "__main__":
+    import redis
+
+    # 存向量要关掉 decode
+    redis_client = redis.Redis(host="localhost", port=6379, decode_responses=False)
+
+    # 停机前导出
+    snapshot(redis_client, "redis_vectors.snap")
+    # 重启后恢复
+    restore(redis_client, "redis_vectors.snap", workers=4)
@@ -0,0 +1,211 @@
+# Weaviate 集合导出/导入：属性写入 Parquet，向量写入连续的 float32 文件，内存占用恒定
+# install
+# pip install -U weaviate-client numpy pyarrow
+
+import json
+import os
+import time
+from typing import Iterator, List, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from embeddingStore import INFO_FILE, VECTOR_FILE
+from weaviateImport import WeaviateBulkLoader
+
+# 属性文件名
+PROPERTIES_FILE = "properties.parquet"
+
+# Weaviate 数据类型到 Arrow 类型的映射；未列出的类型（object、geoCoordinates、phoneNumber 等）以 JSON 字符串保存
+ARROW_TYPES = {
+    "text": pa.string(),
+    "uuid": pa.string(),
+    "blob": pa.string(),
+    "int": pa.int64(),
+    "number": pa.float64(),
+    "boolean": pa.bool_(),
+    "date": pa.timestamp("us", tz="UTC"),
+}
+
+
+def _property_field(prop) -> pa.Field:
+    """
+    根据集合配置中的属性定义生成 Parquet 列。
+    """
+    data_type = getattr(prop.data_type, "value", str(prop.data_type))
+    is_array = data_type.endswith("[]")
+    arrow_type = ARROW_TYPES.get(data_type[:-2] if is_array else data_type)
+    if arrow_type is None:
+        return pa.field(prop.name, pa.string(), metadata={"weaviate_type": data_type, "encoding": "json"})
+    return pa.field(prop.name, pa.list_(arrow_type) if is_array else arrow_type,
+                    metadata={"weaviate_type": data_type})
+
+
+def _build_schema(collection) -> pa.Schema:
+    """
+    从集合配置构建完整的 Parquet schema，保证后出现的属性和首批全为空的属性都有正确的列类型。
+    """
+    fields = [pa.field("uuid", pa.string()), pa.field("has_vector", pa.bool_())]
+    fields.extend(_property_field(prop) for prop in collection.config.get().properties)
+    return pa.schema(fields)
+
+
+def _convert(field: pa.Field, value):
+    """
+    把 Weaviate 返回的属性值转换为与列类型一致的值。
+    """
+    if value is None:
+        return None
+    metadata = field.metadata or {}
+    if metadata.get(b"encoding") == b"json":
+        return json.dumps(value, ensure_ascii=False, default=str)
+    if metadata.get(b"weaviate_type") == b"uuid":
+        return str(value)
+    if metadata.get(b"weaviate_type") == b"uuid[]":
+        return [str(v) for v in value]
+    return value
+
+
+def export_collection(collection, out_dir: str, row_group_size: int = 10000,
+                      vector_name: str = "default", dim: Optional[int] = None) -> int:
+    """
+    分页导出集合中的全部对象。
+
+    collection.iterator 基于 uuid 游标分页读取，每凑满 row_group_size 条就写出一个
+    Parquet 行组并把向量追加到 float32 文件，内存中最多只保留一个行组的数据。
+    Parquet schema 在导出前根据集合配置一次性确定，对象中出现配置以外的属性时报错，不会静默丢弃。
+
+    参数:
+        collection: weaviate 集合对象。
+        out_dir (str): 导出目录。
+        row_group_size (int): 每个行组（也是每页）的对象数，默认为 10000。
+        vector_name (str): 导出的向量名称，默认为 "default"。
+        dim (Optional[int]): 向量维度，默认由第一条向量确定（Weaviate 的集合配置中不保存向量维度）。
+
+    返回:
+        int: 导出的对象数量。
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    vector_path = os.path.join(out_dir, VECTOR_FILE)
+    properties_path = os.path.join(out_dir, PROPERTIES_FILE)
+
+    schema = _build_schema(collection)
+    property_fields = {field.name: field for field in schema if field.name not in ("uuid", "has_vector")}
+    rows: List[dict] = []
+    vectors: List[list] = []
+    # 维度确定之前遇到的无向量对象数，维度确定后补写同样行数的零向量
+    deferred = 0
+    total = 0
+    start = time.perf_counter()
+
+    def flush():
+        nonlocal dim, deferred
+        if dim is None:
+            dim = next((len(v) for v in vectors if v), None)
+            if dim is None:
+                deferred += len(vectors)
+                vectors.clear()
+            elif deferred:
+                vector_file.write(np.zeros((deferred, dim), dtype=np.float32).tobytes())
+                deferred = 0
+        if vectors:
+            matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+            for i, vector in enumerate(vectors):
+                if vector:
+                    if len(vector) != dim:
+                        raise ValueError(f"向量维度不一致: 期望 {dim}, 实际 {len(vector)}")
+                    matrix[i] = vector
+            vector_file.write(matrix.tobytes())
+
+        writer.write_table(pa.Table.from_pylist(rows, schema=schema), row_group_size=len(rows))
+        rows.clear()
+        vectors.clear()
+
+    with open(vector_path, "wb") as vector_file, pq.ParquetWriter(properties_path, schema) as writer:
+        for item in collection.iterator(include_vector=True, cache_size=row_group_size):
+            unknown = item.properties.keys() - property_fields.keys()
+            if unknown:
+                raise ValueError(f"对象 {item.uuid} 含有集合配置中不存在的属性: {sorted(unknown)}")
+            vector = item.vector.get(vector_name) if isinstance(item.vector, dict) else item.vector
+            row = {name: _convert(property_fields[name], value) for name, value in item.properties.items()}
+            row.update(uuid=str(item.uuid), has_vector=bool(vector))
+            rows.append(row)
+            vectors.append(vector)
+            total += 1
+            if len(rows) >= row_group_size:
+                flush()
+                print(f"已导出 {total} 条，{total / (time.perf_counter() - start):.0f} 对象/秒")
+        if rows:
+            flush()
+
+    with open(os.path.join(out_dir, INFO_FILE), "w", encoding="utf-8") as f:
+        json.dump({"dim": dim or 0, "dtype": "float32", "count": total}, f)
+    print(f"✅ 导出完成: {total} 条 -> {out_dir}")
+    return total
+
+
+def iter_export(out_dir: str, batch_size: int = 10000) -> Iterator[dict]:
+    """
+    按批读取导出目录，逐条产出可直接导入的对象。
+
+    参数:
+        out_dir (str): export_collection 的导出目录。
+        batch_size (int): 每次从 Parquet 读取的行数，默认为 10000。
+
+    返回:
+        Iterator[dict]: 形如 {"uuid": ..., "properties": {...}, "vector": ...} 的对象。
+    """
+    with open(os.path.join(out_dir, INFO_FILE), "r", encoding="utf-8") as f:
+        info = json.load(f)
+    if info["count"] == 0:
+        return
+
+    vectors = None
+    if info["dim"]:
+        vectors = np.memmap(os.path.join(out_dir, VECTOR_FILE), dtype=np.float32, mode="r",
+                            shape=(info["count"], info["dim"]))
+
+    row = 0
+    parquet_file = pq.ParquetFile(os.path.join(out_dir, PROPERTIES_FILE))
+    json_columns = {field.name for field in parquet_file.schema_arrow
+                    if field.metadata and field.metadata.get(b"encoding") == b"json"}
+    for record_batch in parquet_file.iter_batches(batch_size=batch_size):
+        for record in record_batch.to_pylist():
+            uuid = record.pop("uuid")
+            has_vector = record.pop("has_vector")
+            properties = {k: json.loads(v) if k in json_columns else v for k, v in record.items() if v is not None}
+            vector = vectors[row] if vectors is not None and has_vector else None
+            yield {"uuid": uuid, "properties": properties, "vector": vector}
+            row += 1
+
+
+def import_collection(collection, out_dir: str, workers: int = 4) -> dict:
+    """
+    把导出目录中的对象通过并发批量导入器写回集合。
+
+    参数:
+        collection: 目标 weaviate 集合对象。
+        out_dir (str): export_collection 的导出目录。
+        workers (int): 并发写入线程数，默认为 4。
+
+    返回:
+        dict: WeaviateBulkLoader.load 返回的导入统计。
+    """
+    return WeaviateBulkLoader(collection, workers=workers).load(iter_export(out_dir))
+
+
+# ========== 使用示例 ==========
+if __name__ == "__main__":
+    import weaviate
+
+    client = weaviate.connect_to_local(host="localhost", port=8080, grpc_port=50051)
+    try:
+        # 备份
+        export_collection(client.collections.get("Database"), "database_backup")
+        # 恢复到新集合
+        if not client.collections.exists("DatabaseRestore"):
+            client.collections.create("DatabaseRestore")
+        import_collection(client.collections.get("DatabaseRestore"), "database_backup")
+    finally:
+        client.close()
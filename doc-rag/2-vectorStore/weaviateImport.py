@@ -0,0 +1,250 @@
+# Weaviate 批量导入：根据服务端延迟动态调整批大小，多线程并发写入，失败对象自动重试
+# install
+# pip install -U weaviate-client numpy
+
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+from uuid import uuid4
+
+import numpy as np
+from weaviate.classes.data import DataObject
+
+
+# ========== 流式数据源 ==========
+def iter_jsonl(file_path: str) -> Iterator[dict]:
+    """
+    逐行读取 JSONL 文件中的对象，不会一次性加载整个文件。
+
+    每行格式: {"properties": {...}, "vector": [...], "uuid": "..."}，其中 uuid 可省略。
+
+    参数:
+        file_path (str): JSONL 文件路径。
+
+    返回:
+        Iterator[dict]: 待导入的对象。
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_numpy(vector_file: str, properties_file: Optional[str] = None, dim: Optional[int] = None) -> Iterator[dict]:
+    """
+    以内存映射方式读取向量文件，逐行产出待导入对象。
+
+    参数:
+        vector_file (str): .npy 文件，或无文件头的 float32 原始文件（需指定 dim）。
+        properties_file (Optional[str]): 与向量逐行对应的属性 JSONL 文件，默认为 None。
+        dim (Optional[int]): 原始 float32 文件的向量维度。
+
+    返回:
+        Iterator[dict]: 待导入的对象。
+    """
+    if vector_file.endswith(".npy"):
+        vectors = np.load(vector_file, mmap_mode="r")
+    else:
+        if dim is None:
+            raise ValueError("读取 float32 原始文件时必须指定 dim")
+        vectors = np.memmap(vector_file, dtype=np.float32, mode="r").reshape(-1, dim)
+
+    properties = iter_jsonl(properties_file) if properties_file else None
+    for i, row in enumerate(vectors):
+        obj = next(properties, None) if properties else {"properties": {}}
+        if obj is None:
+            raise ValueError(f"属性文件只有 {i} 行，少于向量条数 {len(vectors)}")
+        obj["vector"] = row
+        yield obj
+    if properties and next(properties, None) is not None:
+        raise ValueError(f"属性文件行数多于向量条数 {len(vectors)}")
+
+
+# ========== 动态批大小 ==========
+class AdaptiveBatchSize:
+    """
+    根据每批请求的耗时调整批大小（加性增、乘性减）。
+
+    耗时明显低于目标时逐步增大批次，超过目标或出错时减半，
+    让写入速率贴近服务端当前的处理能力。
+    """
+
+    def __init__(self, initial: int = 200, minimum: int = 20, maximum: int = 5000, target_latency: float = 1.0):
+        """
+        参数:
+            initial (int): 初始批大小，默认为 200。
+            minimum (int): 最小批大小，默认为 20。
+            maximum (int): 最大批大小，默认为 5000。
+            target_latency (float): 每批请求的目标耗时（秒），默认为 1.0。
+        """
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float, ok: bool = True):
+        """
+        根据一次批量请求的结果调整批大小。
+
+        参数:
+            latency (float): 本批请求耗时（秒）。
+            ok (bool): 本批请求是否成功。
+        """
+        with self._lock:
+            if not ok or latency > self.target_latency:
+                self.size = max(self.minimum, self.size // 2)
+            elif latency < self.target_latency * 0.5:
+                self.size = min(self.maximum, self.size + max(self.minimum, self.size // 4))
+
+
+# ========== 并发批量导入 ==========
+class WeaviateBulkLoader:
+    """
+    Weaviate 并发批量导入器。
+
+    从任意对象迭代器中按当前批大小取数，交给多个线程调用 insert_many 并发写入；
+    同时在途的批次数有上限，因此输入可以是流式的，不需要提前生成完整的向量列表。
+    """
+
+    def __init__(self, collection, workers: int = 4, batch_size: Optional[AdaptiveBatchSize] = None,
+                 max_retries: int = 3, report_every: float = 5.0):
+        """
+        参数:
+            collection: weaviate 集合对象，即 client.collections.get(...) 的返回值。
+            workers (int): 并发写入线程数，默认为 4。
+            batch_size (Optional[AdaptiveBatchSize]): 批大小控制器，默认使用 AdaptiveBatchSize()。
+            max_retries (int): 单个对象的最大重试次数，默认为 3。
+            report_every (float): 打印进度的间隔（秒），默认为 5.0。
+        """
+        self.collection = collection
+        self.workers = workers
+        self.batch_size = batch_size or AdaptiveBatchSize()
+        self.max_retries = max_retries
+        self.report_every = report_every
+        self.failed_objects: List[dict] = []
+
+    @staticmethod
+    def _to_data_object(obj: dict) -> DataObject:
+        """
+        把字典格式的对象转换为 DataObject。
+
+        uuid 在首次提交前已由 load 分配，重试时使用相同的 uuid，服务端按 uuid 覆盖写入，
+        即使上一次请求超时但实际已提交，也不会产生重复对象。
+        """
+        vector = obj.get("vector")
+        if isinstance(vector, np.ndarray):
+            vector = vector.tolist()
+        return DataObject(properties=obj.get("properties", {}), vector=vector, uuid=obj.get("uuid"))
+
+    def _insert(self, batch: List[dict], attempt: int):
+        """
+        写入一批对象（在工作线程中执行）。
+
+        参数:
+            batch (List[dict]): 待写入的对象。
+            attempt (int): 当前重试次数，大于 0 时先指数退避等待。
+
+        返回:
+            tuple: (成功条数, 失败对象列表, 本批次重试次数)。
+        """
+        if attempt:
+            time.sleep(min(2 ** attempt * 0.5, 10))
+
+        start = time.perf_counter()
+        try:
+            result = self.collection.data.insert_many([self._to_data_object(obj) for obj in batch])
+        except Exception as e:
+            self.batch_size.observe(time.perf_counter() - start, ok=False)
+            print(f"❌ 批量写入失败({len(batch)} 条): {e}")
+            return 0, batch, attempt
+
+        # 单个对象的校验错误与服务端负载无关，只按请求耗时调整批大小
+        self.batch_size.observe(time.perf_counter() - start)
+        failed = [batch[i] for i in result.errors]
+        return len(batch) - len(failed), failed, attempt
+
+    def load(self, objects: Iterable[dict]) -> dict:
+        """
+        并发导入全部对象。
+
+        参数:
+            objects (Iterable[dict]): 对象迭代器，元素格式同 iter_jsonl 的输出。
+
+        返回:
+            dict: 导入统计，包括成功数、失败数、耗时和每秒写入对象数。
+        """
+        objects = iter(objects)
+        retries = deque()
+        inserted = 0
+        self.failed_objects = []
+        start = last_report = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            exhausted = False
+            while pending or retries or not exhausted:
+                # 控制在途批次数（包括重试批次），输入按需读取
+                while len(pending) < self.workers * 2:
+                    if retries:
+                        batch, attempt = retries.popleft()
+                        pending.add(executor.submit(self._insert, batch, attempt))
+                        continue
+                    if exhausted:
+                        break
+                    batch = list(islice(objects, self.batch_size.size))
+                    if not batch:
+                        exhausted = True
+                        break
+                    # 在客户端分配 uuid，保证重试幂等
+                    for obj in batch:
+                        if obj.get("uuid") is None:
+                            obj["uuid"] = str(uuid4())
+                    pending.add(executor.submit(self._insert, batch, 0))
+                if not pending:
+                    break
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    ok_count, failed, attempt = future.result()
+                    inserted += ok_count
+                    if failed and attempt < self.max_retries:
+                        retries.append((failed, attempt + 1))
+                    else:
+                        self.failed_objects.extend(failed)
+
+                now = time.perf_counter()
+                if now - last_report >= self.report_every:
+                    print(f"已导入 {inserted} 条，{inserted / (now - start):.0f} 对象/秒，当前批大小 {self.batch_size.size}")
+                    last_report = now
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "inserted": inserted,
+            "failed": len(self.failed_objects),
+            "seconds": elapsed,
+            "objects_per_sec": inserted / elapsed if elapsed else 0.0,
+        }
+        print(f"✅ 导入完成: 成功 {inserted} 条，失败 {len(self.failed_objects)} 条，"
+              f"{stats['objects_per_sec']:.0f} 对象/秒")
+        return stats
+
+
+# ========== 使用示例 ==========
+if __name__ == "__main__":
+    import weaviate
+
+    client = weaviate.connect_to_local(host="localhost", port=8080, grpc_port=50051)
+    try:
+        collection = client.collections.get("Database")
+        loader = WeaviateBulkLoader(collection, workers=4)
+        # 从 JSONL 流式导入
+        loader.load(iter_jsonl("objects.jsonl"))
+        if loader.failed_objects:
+            print(f"第一个导入失败对象: {loader.failed_objects[0]}")
+    finally:
+        client.close()